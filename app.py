@@ -331,6 +331,26 @@ def get_price_history(days=7):
         cursor.close()
         return [dict(price) for price in prices]
 
+# Shared HTTP session so CoinGecko requests reuse keep-alive connections
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Return the process-wide requests.Session, creating it on first use"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                # Retries are handled by the callers' own backoff loops
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Connection": "keep-alive"})
+                _http_session = session
+    return _http_session
+
 def fetch_bitcoin_price():
     """Fetch current Bitcoin price from CoinGecko API"""
     max_retries = int(os.environ.get("COINGECKO_RETRY_LIMIT", 3))
@@ -351,7 +371,7 @@ def fetch_bitcoin_price():
             if api_key:
                 headers["x-cg-api-key"] = api_key
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = get_http_session().get(url, params=params, headers=headers, timeout=(3, 10))
             
             # Handle rate limiting
             if response.status_code == 429:
@@ -69,6 +69,7 @@ class Config:
         # CoinGecko API configuration
         self.coingecko_api_url = os.environ.get('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3')
         self.coingecko_retry_limit = int(os.environ.get('COINGECKO_RETRY_LIMIT', '3'))
+        self.price_cache_ttl_seconds = int(os.environ.get('PRICE_CACHE_TTL_SECONDS', '45')) # 0 disables the cache
         
         # Groq LLM Configuration
         self.groq_api_key = os.environ.get('GROQ_API_KEY')
@@ -92,6 +93,10 @@ class Config:
         self.llm_analyze_temp = float(os.environ.get('LLM_ANALYZE_TEMP', '0.2'))
         self.llm_analyze_max_tokens = int(os.environ.get('LLM_ANALYZE_MAX_TOKENS', '150'))
         self.news_analysis_batch_size = int(os.environ.get('NEWS_ANALYSIS_BATCH_SIZE', '30'))
+        self.news_analysis_max_batches = int(os.environ.get('NEWS_ANALYSIS_MAX_BATCHES', '10')) # Batches per cycle while a backlog remains
+        self.groq_concurrency = int(os.environ.get('GROQ_CONCURRENCY', '8')) # Max Groq requests in flight
+        self.llm_sub_batch_size = int(os.environ.get('LLM_SUB_BATCH', '8')) # Tweets analyzed per Groq request
+        self.news_llm_prior_threshold = float(os.environ.get('NEWS_LLM_PRIOR_THRESHOLD', '0.1')) # Below this (and short), skip the LLM
         self.news_processing_timeout_seconds = int(os.environ.get('NEWS_PROCESSING_TIMEOUT_SECONDS', '300'))
         self.news_hours_limit = int(os.environ.get('NEWS_HOURS_LIMIT', '12')) # How many hours back to look for analyzed news
 
@@ -155,10 +160,15 @@ class Config:
             "timezone": self.timezone,
             "coingecko_api_url": self.coingecko_api_url,
             "coingecko_retry_limit": self.coingecko_retry_limit,
+            "price_cache_ttl_seconds": self.price_cache_ttl_seconds,
             "news_fetch_max_results": self.news_fetch_max_results,
             "llm_analyze_temp": self.llm_analyze_temp,
             "llm_analyze_max_tokens": self.llm_analyze_max_tokens,
             "news_analysis_batch_size": self.news_analysis_batch_size,
+            "news_analysis_max_batches": self.news_analysis_max_batches,
+            "groq_concurrency": self.groq_concurrency,
+            "llm_sub_batch_size": self.llm_sub_batch_size,
+            "news_llm_prior_threshold": self.news_llm_prior_threshold,
             "news_processing_timeout_seconds": self.news_processing_timeout_seconds,
             "news_hours_limit": self.news_hours_limit,
             "duplicate_post_check_minutes": self.duplicate_post_check_minutes,
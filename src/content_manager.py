@@ -11,10 +11,10 @@ from typing import Dict, Any, Optional
 logger = logging.getLogger(__name__)
 
 class ContentManager:
-    def __init__(self, db_path: str = "btcbuzzbot.db"):
+    def __init__(self, db_path: str = "btcbuzzbot.db", pool=None):
         """Initializes the ContentManager with a ContentRepository instance."""
         # Instantiate ContentRepository instead of Database
-        self.repo = ContentRepository(db_path=db_path)
+        self.repo = ContentRepository(db_path=db_path, pool=pool)
         if not self.repo:
              logger.error("ContentManager failed to initialize ContentRepository.")
              # Handle error appropriately, maybe raise an exception
@@ -97,16 +97,14 @@ class ContentManager:
             jokes_count = await self.repo.count_records("jokes")
             
             if quotes_count == 0:
-                # Add quotes
-                for quote in quotes:
-                    await self.add_quote(quote)
-                print(f"Added {len(quotes)} quotes to the database")
+                # Add quotes in a single transaction
+                added = await self.repo.add_many("quotes", [(quote, "motivational") for quote in quotes])
+                print(f"Added {added} quotes to the database")
                 
             if jokes_count == 0:
-                # Add jokes
-                for joke in jokes:
-                    await self.add_joke(joke)
-                print(f"Added {len(jokes)} jokes to the database")
+                # Add jokes in a single transaction
+                added = await self.repo.add_many("jokes", [(joke, "humor") for joke in jokes])
+                print(f"Added {added} jokes to the database")
                 
             print(f"Database has {quotes_count} quotes and {jokes_count} jokes")
         except Exception as e:
@@ -4,7 +4,7 @@ import os
 import json
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 import sys
 import asyncio
 from urllib.parse import urlparse
@@ -19,14 +19,31 @@ try:
 except ImportError:
     PSYCOPG2_AVAILABLE = False
 
+# Databases whose tables this process already created (DATABASE_URL or absolute SQLite path).
+# Database objects are built per posting run; the schema only needs checking once.
+_initialized_databases = set()
+
 # Default configuration value
 DEFAULT_DUPLICATE_POST_CHECK_MINUTES = 5
 DEFAULT_CONTENT_REUSE_DAYS = 7 # Add default for content reuse
 
+# posts.timestamp is compared as raw text against precomputed cutoffs so idx_posts_timestamp
+# can serve a range scan instead of calling datetime() per row. Rows are ISO
+# 'YYYY-MM-DDTHH:MM:SS' (log_post) but older writers used a space separator; the second
+# branch matches those without catching same-day 'T' rows.
+_SQLITE_RECENT_POST_CONDITION = "(timestamp > ? OR (timestamp > ? AND timestamp < ?))"
+
+def _sqlite_recent_post_params(minutes: int) -> tuple:
+    """Query parameters for _SQLITE_RECENT_POST_CONDITION."""
+    cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+    cutoff_iso = cutoff.isoformat(timespec='seconds')
+    return (cutoff_iso, cutoff.isoformat(sep=' ', timespec='seconds'), cutoff_iso[:10] + 'T')
+
 class Database:
-    def __init__(self, db_path: str = "btcbuzzbot.db"):
+    def __init__(self, db_path: str = "btcbuzzbot.db", pool=None):
         """Initialize database connection - supports both SQLite and PostgreSQL"""
         self.db_path = db_path
+        self.pool = pool # Optional SqlitePool shared with the repositories
         self.connection = None
         
         # Heroku provides DATABASE_URL, but may use postgres:// prefix which psycopg2 doesn't support
@@ -40,25 +57,36 @@ class Database:
         if self.is_postgres:
             print(f"Using PostgreSQL database from DATABASE_URL")
             # Create tables synchronously during initialization for PostgreSQL
-            try:
-                self._create_tables_postgres()
-                print("PostgreSQL database initialized successfully")
-            except Exception as e:
-                print(f"Error initializing PostgreSQL database: {e}", file=sys.stderr)
-                raise
+            if self.db_url not in _initialized_databases:
+                try:
+                    self._create_tables_postgres()
+                    _initialized_databases.add(self.db_url)
+                    print("PostgreSQL database initialized successfully")
+                except Exception as e:
+                    print(f"Error initializing PostgreSQL database: {e}", file=sys.stderr)
+                    raise
         else:
             print(f"Using SQLite database at: {os.path.abspath(db_path)}")
-            # Ensure directory exists for SQLite
-            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
-            
-            # Create tables synchronously during initialization for SQLite
-            try:
-                self._create_tables_sqlite()
-                print("SQLite database initialized successfully")
-            except Exception as e:
-                print(f"Error initializing SQLite database: {e}", file=sys.stderr)
-                raise
+            db_key = os.path.abspath(db_path)
+            if db_key not in _initialized_databases or not os.path.exists(db_key):
+                # Ensure directory exists for SQLite
+                os.makedirs(os.path.dirname(db_key), exist_ok=True)
+                
+                # Create tables synchronously during initialization for SQLite
+                try:
+                    self._create_tables_sqlite()
+                    _initialized_databases.add(db_key)
+                    print("SQLite database initialized successfully")
+                except Exception as e:
+                    print(f"Error initializing SQLite database: {e}", file=sys.stderr)
+                    raise
     
+    def _sqlite_connect(self):
+        """Return the shared pool connection if one was given, else a fresh aiosqlite connection"""
+        if self.pool is not None:
+            return self.pool.connection()
+        return aiosqlite.connect(self.db_path)
+
     def _get_postgres_connection(self):
         """Get PostgreSQL connection"""
         if not self.is_postgres:
@@ -195,6 +223,27 @@ class Database:
             
             conn.commit()
             print("PostgreSQL tables checked/created.")
+
+            # Serves the news selection in post_btc_update (analyzed rows by significance).
+            # Kept in its own transaction so an older news_tweets layout can't block table setup.
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        "CREATE INDEX IF NOT EXISTS idx_news_tweets_significance "
+                        "ON news_tweets (significance_score DESC, published_at DESC) WHERE processed = TRUE;"
+                    )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.warning(f"Could not create news_tweets significance index: {e}")
+            # Serves has_posted_recently() and latest-post lookups
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_timestamp ON posts (timestamp DESC);")
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.warning(f"Could not create posts timestamp index: {e}")
                 
         except Exception as e:
             print(f"Error creating/checking PostgreSQL tables: {e}")
@@ -277,6 +326,16 @@ class Database:
                 llm_analysis TEXT -- SQLite uses TEXT for JSON
             );
             ''')
+            # Serves the news selection in post_btc_update (analyzed rows by significance)
+            try:
+                cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_news_tweets_significance
+                ON news_tweets (significance_score DESC, published_at DESC);
+                ''')
+            except sqlite3.OperationalError as e:
+                logger.warning(f"Could not create news_tweets significance index: {e}")
+            # Serves has_posted_recently() and latest-post lookups
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_posts_timestamp ON posts (timestamp DESC);")
             
             # --- Add Scheduler/Web Interface Tables (SQLite) ---
             cursor.execute('''
@@ -322,7 +381,7 @@ class Database:
                 return lastrowid
             else:
                 # For SQLite
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(
                         "INSERT INTO prices (price, timestamp, source) VALUES (?, ?, ?)",
                         (price, datetime.utcnow().isoformat(), "coingecko")
@@ -350,7 +409,7 @@ class Database:
                 return None
             else:
                 # For SQLite
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = aiosqlite.Row
                     async with db.execute(
                         "SELECT * FROM prices ORDER BY timestamp DESC LIMIT 1"
@@ -391,7 +450,7 @@ class Database:
                 return row[0] if row else None
             else:
                 # SQLite: Similar logic using datetime function.
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     # Select the price from the most recent record older than 24 hours.
                     sql_query = """
                         SELECT price 
@@ -429,20 +488,75 @@ class Database:
                 return lastrowid
             else:
                 # SQLite implementation
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(
                         """
                         INSERT INTO posts 
                         (tweet_id, tweet, timestamp, price, price_change, content_type, likes, retweets) 
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (tweet_id, tweet, datetime.utcnow().isoformat(), price, price_change, content_type, 0, 0) # engagement_last_checked will be NULL by default
-                )
-                await db.commit()
-                return cursor.lastrowid
+                        """,
+                        (tweet_id, tweet, datetime.utcnow().isoformat(), price, price_change, content_type, 0, 0) # engagement_last_checked will be NULL by default
+                    )
+                    await db.commit()
+                    return cursor.lastrowid
         except Exception as e:
             print(f"Error logging post: {e}")
             return -1
+
+    async def log_post_with_price(self, tweet_id: str, tweet: str, price: float, price_change: float, content_type: str) -> int:
+        """Store the BTC price and log the post that used it in a single transaction"""
+        try:
+            if self.is_postgres:
+                conn = self._get_postgres_connection()
+                try:
+                    cursor = conn.cursor()
+                    cursor.execute(
+                        "INSERT INTO prices (price, timestamp, source) VALUES (%s, NOW(), %s)",
+                        (price, "coingecko")
+                    )
+                    cursor.execute(
+                        """
+                        INSERT INTO posts 
+                        (tweet_id, tweet, timestamp, price, price_change, content_type, likes, retweets) 
+                        VALUES (%s, %s, NOW(), %s, %s, %s, %s, %s) RETURNING id
+                        """,
+                        (tweet_id, tweet, price, price_change, content_type, 0, 0)
+                    )
+                    lastrowid = cursor.fetchone()[0]
+                    conn.commit()
+                    cursor.close()
+                    return lastrowid
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.close()
+            else:
+                now_iso = datetime.utcnow().isoformat()
+                async with self._sqlite_connect() as db:
+                    # Take the write lock up front so neither insert can hit SQLITE_BUSY mid-way
+                    await db.execute("BEGIN IMMEDIATE")
+                    try:
+                        await db.execute(
+                            "INSERT INTO prices (price, timestamp, source) VALUES (?, ?, ?)",
+                            (price, now_iso, "coingecko")
+                        )
+                        cursor = await db.execute(
+                            """
+                            INSERT INTO posts 
+                            (tweet_id, tweet, timestamp, price, price_change, content_type, likes, retweets) 
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                            """,
+                            (tweet_id, tweet, now_iso, price, price_change, content_type, 0, 0)
+                        )
+                        await db.commit()
+                    except Exception:
+                        await db.rollback()
+                        raise
+                    return cursor.lastrowid
+        except Exception as e:
+            print(f"Error storing price and logging post: {e}")
+            return -1
     
     async def update_post_engagement(self, tweet_id: str, likes: int, retweets: int) -> bool:
         """Update likes and retweets for a given post and set engagement_last_checked."""
@@ -465,7 +579,7 @@ class Database:
                 conn.close()
                 return updated_rows > 0
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(
                         """
                         UPDATE posts 
@@ -500,7 +614,7 @@ class Database:
                 cursor.close()
                 conn.close()
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = sqlite3.Row # To get dict-like rows
                     async with db.execute(
                         """
@@ -533,7 +647,7 @@ class Database:
                 return count
             else:
                 # For SQLite
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     async with db.execute(f"SELECT COUNT(*) FROM {table_name}") as cursor:
                         result = await cursor.fetchone()
                         return result[0] if result else 0
@@ -565,10 +679,10 @@ class Database:
                 return result is not None
             else:
                 # SQLite implementation
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     async with db.execute(
-                        "SELECT 1 FROM posts WHERE datetime(timestamp) > datetime('now', ? || ' minutes') LIMIT 1",
-                        (f"-{check_minutes}",) # Use the determined check_minutes
+                        f"SELECT 1 FROM posts WHERE {_SQLITE_RECENT_POST_CONDITION} LIMIT 1",
+                        _sqlite_recent_post_params(check_minutes)
                     ) as cursor:
                         row = await cursor.fetchone()
                         return row is not None
@@ -577,6 +691,51 @@ class Database:
             # Default to false to avoid blocking posts unnecessarily in case of error
             return False
 
+    async def get_latest_price_and_recent_post(self, minutes: int) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Get the most recent BTC price and whether a post was made within the last X minutes.
+
+        Same results as get_latest_price() plus has_posted_recently(), but in a single query.
+        """
+        try:
+            if self.is_postgres:
+                conn = self._get_postgres_connection()
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                cursor.execute(
+                    "SELECT latest.id, latest.price, latest.timestamp, latest.source, "
+                    "EXISTS (SELECT 1 FROM posts WHERE timestamp > NOW() - %s * INTERVAL '1 minute') AS posted_recently "
+                    "FROM (SELECT 1) AS one "
+                    "LEFT JOIN (SELECT * FROM prices ORDER BY timestamp DESC LIMIT 1) AS latest ON TRUE",
+                    (minutes,)
+                )
+                row = cursor.fetchone()
+                cursor.close()
+                conn.close()
+            else:
+                async with self._sqlite_connect() as db:
+                    db.row_factory = aiosqlite.Row
+                    async with db.execute(
+                        "SELECT latest.id, latest.price, latest.timestamp, latest.source, "
+                        f"EXISTS (SELECT 1 FROM posts WHERE {_SQLITE_RECENT_POST_CONDITION}) AS posted_recently "
+                        "FROM (SELECT 1) AS one "
+                        "LEFT JOIN (SELECT * FROM prices ORDER BY timestamp DESC LIMIT 1) AS latest ON 1",
+                        _sqlite_recent_post_params(minutes)
+                    ) as cursor:
+                        row = await cursor.fetchone()
+
+            latest_price = None
+            if row["id"] is not None:
+                latest_price = {
+                    "id": row["id"],
+                    "price": row["price"],
+                    "timestamp": row["timestamp"],
+                    "source": row["source"]
+                }
+            return latest_price, bool(row["posted_recently"])
+        except Exception as e:
+            print(f"Error getting latest price and recent posts: {e}")
+            # Same fallbacks as get_latest_price() and has_posted_recently()
+            return None, False
+
     # --- Scheduler/Status Specific Methods --- 
 
     async def log_bot_status(self, status: str, message: str):
@@ -607,7 +766,7 @@ class Database:
                 conn.close()
             else:
                 # SQLite implementation
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     # Get next scheduled run time if status is 'scheduled'
                     next_run_str = None
                     if status.lower() == 'scheduled':
@@ -636,7 +795,7 @@ class Database:
                 conn.close()
                 return row[0] if row else None
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     async with db.execute("SELECT value FROM scheduler_config WHERE key = ?", ('schedule',)) as cursor:
                         row = await cursor.fetchone()
                         return row[0] if row else None
@@ -658,7 +817,7 @@ class Database:
                 cursor.close()
                 conn.close()
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     await db.execute(
                         "INSERT OR REPLACE INTO scheduler_config (key, value) VALUES (?, ?)",
                         ('schedule', schedule_str)
@@ -668,8 +827,8 @@ class Database:
             print(f"Error updating scheduler config: {e}", file=sys.stderr)
 
     async def close(self):
-        """Close the database connection if it's open"""
+        """Close the database connection if it's open. Safe to call more than once."""
         # Currently connections are managed per-operation for async SQLite
-        # and sync PostgreSQL, so this might not be strictly necessary
-        # unless a persistent connection pattern is introduced.
-        pass 
\ No newline at end of file
+        # and sync PostgreSQL (a shared SqlitePool is closed by its owner),
+        # so there is nothing to release here.
+        pass
\ No newline at end of file
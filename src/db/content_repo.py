@@ -29,10 +29,14 @@ except ImportError:
 # Default configuration value from original Database class
 DEFAULT_CONTENT_REUSE_DAYS = 7
 
+# Tables that hold postable content; names are interpolated into SQL, so only these are allowed
+CONTENT_COLLECTIONS = ('quotes', 'jokes')
+
 class ContentRepository:
-    def __init__(self, db_path: str = "btcbuzzbot.db"):
+    def __init__(self, db_path: str = "btcbuzzbot.db", pool=None):
         """Initialize repository - copies connection logic from original Database class."""
         self.db_path = db_path
+        self.pool = pool # Optional SqlitePool shared with the other repositories
         self.connection = None # Keep for potential future use?
 
         # Heroku provides DATABASE_URL, check for PostgreSQL
@@ -49,6 +53,12 @@ class ContentRepository:
         logger.info(f"ContentRepository initialized. Using {'PostgreSQL' if self.is_postgres else 'SQLite'}.")
 
     # Copy of PostgreSQL connection helper from original Database class
+    def _sqlite_connect(self):
+        """Return the shared pool connection if one was given, else a fresh aiosqlite connection"""
+        if self.pool is not None:
+            return self.pool.connection()
+        return aiosqlite.connect(self.db_path)
+
     def _get_postgres_connection(self):
         """Get PostgreSQL connection (sync)."""
         if not self.is_postgres:
@@ -109,7 +119,7 @@ class ContentRepository:
                 conn.close()
                 return None
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = aiosqlite.Row
                     sql_query = f"""
                         SELECT * FROM {collection_name} 
@@ -154,7 +164,7 @@ class ContentRepository:
                 logger.info(f"Added quote ID: {lastrowid}")
                 return lastrowid
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(
                         "INSERT INTO quotes (text, category, created_at, used_count) VALUES (?, ?, datetime('now'), ?)",
                         (text, category, 0)
@@ -184,7 +194,7 @@ class ContentRepository:
                  else:
                     logger.info("[Postgres] No quotes found.")
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = aiosqlite.Row # Use Row factory for dict-like access
                     async with db.execute(sql) as cursor:
                         rows = await cursor.fetchall()
@@ -216,7 +226,7 @@ class ContentRepository:
                 else:
                     logger.warning(f"[Postgres] No quote found with ID: {quote_id} to delete.")
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(sql, (quote_id,))
                     await db.commit()
                     if cursor.rowcount > 0:
@@ -245,7 +255,7 @@ class ContentRepository:
                 logger.info(f"Added joke ID: {lastrowid}")
                 return lastrowid
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(
                         "INSERT INTO jokes (text, category, created_at, used_count) VALUES (?, ?, datetime('now'), ?)",
                         (text, category, 0)
@@ -275,7 +285,7 @@ class ContentRepository:
                 else:
                     logger.info("[Postgres] No jokes found.")
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = aiosqlite.Row
                     async with db.execute(sql) as cursor:
                         rows = await cursor.fetchall()
@@ -307,7 +317,7 @@ class ContentRepository:
                 else:
                     logger.warning(f"[Postgres] No joke found with ID: {joke_id} to delete.")
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(sql, (joke_id,))
                     await db.commit()
                     if cursor.rowcount > 0:
@@ -319,5 +329,65 @@ class ContentRepository:
             logger.error(f"Error deleting joke ID {joke_id}: {e}", exc_info=True)
         return deleted
 
+    async def count_records(self, collection_name: str) -> int:
+        """Count the rows in the quotes or jokes table."""
+        if collection_name not in CONTENT_COLLECTIONS:
+            raise ValueError(f"Unknown content collection: {collection_name}")
+        sql = f"SELECT COUNT(*) FROM {collection_name}"
+        if self.is_postgres:
+            conn = self._get_postgres_connection()
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            count = cursor.fetchone()[0]
+            cursor.close()
+            conn.close()
+            return count
+        async with self._sqlite_connect() as db:
+            async with db.execute(sql) as cursor:
+                row = await cursor.fetchone()
+                return row[0] if row else 0
+
+    async def add_many(self, collection_name: str, rows: List[tuple]) -> int:
+        """Insert many (text, category) rows into quotes or jokes in one transaction."""
+        if collection_name not in CONTENT_COLLECTIONS:
+            raise ValueError(f"Unknown content collection: {collection_name}")
+        if not rows:
+            return 0
+        params = [(text, category, 0) for text, category in rows]
+        try:
+            if self.is_postgres:
+                conn = self._get_postgres_connection()
+                try:
+                    cursor = conn.cursor()
+                    cursor.executemany(
+                        f"INSERT INTO {collection_name} (text, category, created_at, used_count) VALUES (%s, %s, NOW(), %s)",
+                        params
+                    )
+                    conn.commit()
+                    cursor.close()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.close()
+            else:
+                async with self._sqlite_connect() as db:
+                    # One write lock and one commit for the whole batch
+                    await db.execute("BEGIN IMMEDIATE")
+                    try:
+                        await db.executemany(
+                            f"INSERT INTO {collection_name} (text, category, created_at, used_count) VALUES (?, ?, datetime('now'), ?)",
+                            params
+                        )
+                        await db.commit()
+                    except Exception:
+                        await db.rollback()
+                        raise
+            logger.info(f"Added {len(params)} rows to {collection_name}.")
+            return len(params)
+        except Exception as e:
+            logger.error(f"Error bulk-adding to {collection_name}: {e}", exc_info=True)
+            return 0
+
     # Remove problematic _get_db_cursor placeholder
     # async def _get_db_cursor(self, dictionary=False): ... 
\ No newline at end of file
@@ -3,10 +3,10 @@ Repository for managing news tweet data.
 """
 import logging
 import os
-import sys
 import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from urllib.parse import urlparse
 import json
 
@@ -27,10 +27,39 @@ try:
 except ImportError:
     AIOSQLITE_AVAILABLE = False
 
+# orjson serializes analysis results faster; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(obj) -> str:
+    return orjson.dumps(obj).decode() if ORJSON_AVAILABLE else json.dumps(obj)
+
+# Scores stored alongside the LLM labels
+_SENTIMENT_SCORES = {"Positive": 0.7, "Negative": -0.7, "Neutral": 0.0}
+_SIGNIFICANCE_SCORES = {"High": 1.0, "Medium": 0.5, "Low": 0.1}
+
+# get_top_significant_news() results, shared by every repository instance in the process:
+# (database, hours_limit, high_threshold, medium_threshold) -> (stored_at, news_item)
+TOP_NEWS_CACHE_TTL_SECONDS = 60
+_top_news_cache: Dict[tuple, tuple] = {}
+
+def clear_top_news_cache():
+    """Drop cached news selections, e.g. after analysis results change."""
+    _top_news_cache.clear()
+
+# Fields store_news_tweet() needs before it will insert a row
+_NEWS_TWEET_REQUIRED_FIELDS = frozenset((
+    'original_tweet_id', 'author_id', 'text', 'published_at', 'fetched_at', 'metrics', 'source'
+))
+
 class NewsRepository:
-    def __init__(self, db_path: str = "btcbuzzbot.db"):
+    def __init__(self, db_path: str = "btcbuzzbot.db", pool=None):
         """Initialize repository - copies connection logic from original Database class."""
         self.db_path = db_path
+        self.pool = pool # Optional SqlitePool shared with the other repositories
 
         # Heroku provides DATABASE_URL, check for PostgreSQL
         db_url = os.environ.get('DATABASE_URL')
@@ -46,6 +75,12 @@ class NewsRepository:
         logger.info(f"NewsRepository initialized. Using {'PostgreSQL' if self.is_postgres else 'SQLite'}.")
 
     # Copy of PostgreSQL connection helper from original Database class
+    def _sqlite_connect(self):
+        """Return the shared pool connection if one was given, else a fresh aiosqlite connection"""
+        if self.pool is not None:
+            return self.pool.connection()
+        return aiosqlite.connect(self.db_path)
+
     def _get_postgres_connection(self):
         """Get PostgreSQL connection (sync)."""
         if not self.is_postgres:
@@ -74,10 +109,9 @@ class NewsRepository:
 
     async def store_news_tweet(self, tweet_data: Dict[str, Any]) -> Optional[int]:
         """Store a fetched tweet into the news_tweets table, ignoring duplicates."""
-        required_fields = ['original_tweet_id', 'author_id', 'text', 'published_at', 'fetched_at', 'metrics', 'source']
-        if not all(field in tweet_data for field in required_fields):
-            missing = [field for field in required_fields if field not in tweet_data]
-            logger.error(f"Error storing news tweet: Missing required fields {missing} in {tweet_data.keys()}", file=sys.stderr)
+        missing = _NEWS_TWEET_REQUIRED_FIELDS.difference(tweet_data)
+        if missing:
+            logger.error(f"Error storing news tweet: Missing required fields {sorted(missing)} in {tweet_data.keys()}")
             return None
 
         # Extract data, handling potential Nones for non-required fields
@@ -137,7 +171,7 @@ class NewsRepository:
                     original_tweet_id, author_id, text, published_at, fetched_at, metrics_db, source,
                     processed, sentiment_score, sentiment_label, keywords, summary, llm_analysis_db
                 )
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     cursor = await db.execute(sql, params)
                     await db.commit()
                     # Return lastrowid only if a row was inserted (changes > 0)
@@ -164,7 +198,7 @@ class NewsRepository:
                 # else:
                     # logger.info("[Postgres] No existing tweets found.")
             else:
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     async with db.execute(sql) as cursor:
                         result = await cursor.fetchone()
                         if result and result[0] is not None:
@@ -208,7 +242,7 @@ class NewsRepository:
                   AND datetime(published_at) >= datetime('now', ? || ' hours')
                 ORDER BY significance_score DESC, published_at DESC;
                 """
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = aiosqlite.Row # Ensure results are dict-like
                     async with db.execute(sql, (f"-{hours_limit}",)) as cursor:
                         rows = await cursor.fetchall()
@@ -217,6 +251,72 @@ class NewsRepository:
             logger.error(f"Error fetching recent analyzed news: {e}", exc_info=True)
         return tweets
 
+    async def get_top_significant_news(
+        self,
+        hours_limit: int = 12,
+        high_threshold: float = 0.8,
+        medium_threshold: float = 0.4
+    ) -> Optional[Dict[str, Any]]:
+        """Get the single best recent news item worth tweeting about, or None.
+
+        High-significance items always qualify. Medium-significance items need
+        Positive/Neutral sentiment that did not come from the VADER fallback.
+        """
+        cache_key = (self.db_url if self.is_postgres else self.db_path,
+                     hours_limit, high_threshold, medium_threshold)
+        cached = _top_news_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < TOP_NEWS_CACHE_TTL_SECONDS:
+            return dict(cached[1]) if cached[1] else None
+
+        columns = """original_tweet_id, text, summary, significance_label, significance_score,
+                   sentiment_label, sentiment_score, sentiment_source, published_at"""
+        news_item = None
+        try:
+            if self.is_postgres:
+                sql = f"""
+                SELECT {columns}
+                FROM news_tweets
+                WHERE processed = TRUE
+                  AND summary IS NOT NULL AND summary <> ''
+                  AND published_at >= NOW() - %s * INTERVAL '1 hour'
+                  AND (significance_score >= %s
+                       OR (significance_score >= %s
+                           AND sentiment_label IN ('Positive', 'Neutral')
+                           AND (sentiment_source IS NULL OR sentiment_source NOT LIKE '%%vader_fallback%%')))
+                ORDER BY significance_score DESC, published_at DESC
+                LIMIT 1;
+                """
+                conn = self._get_postgres_connection()
+                cursor = conn.cursor(cursor_factory=RealDictCursor)
+                cursor.execute(sql, (hours_limit, high_threshold, medium_threshold))
+                row = cursor.fetchone()
+                cursor.close()
+                conn.close()
+                news_item = dict(row) if row else None
+            else:
+                sql = f"""
+                SELECT {columns}
+                FROM news_tweets
+                WHERE processed = 1
+                  AND summary IS NOT NULL AND summary <> ''
+                  AND datetime(published_at) >= datetime('now', ? || ' hours')
+                  AND (significance_score >= ?
+                       OR (significance_score >= ?
+                           AND sentiment_label IN ('Positive', 'Neutral')
+                           AND (sentiment_source IS NULL OR sentiment_source NOT LIKE '%vader_fallback%')))
+                ORDER BY significance_score DESC, published_at DESC
+                LIMIT 1;
+                """
+                async with self._sqlite_connect() as db:
+                    db.row_factory = aiosqlite.Row
+                    async with db.execute(sql, (f"-{hours_limit}", high_threshold, medium_threshold)) as cursor:
+                        row = await cursor.fetchone()
+                        news_item = dict(row) if row else None
+            _top_news_cache[cache_key] = (time.monotonic(), news_item)
+        except Exception as e:
+            logger.error(f"Error fetching top significant news: {e}", exc_info=True)
+        return dict(news_item) if news_item else None
+
     async def get_unprocessed_news_tweets(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get tweets that haven't been analyzed (processed=False)."""
         tweets = []
@@ -260,7 +360,7 @@ class NewsRepository:
                 # Log count of tweets with processed = 1 AND llm_analysis IS NULL
                 count_sql_processed_null_analysis = "SELECT COUNT(*) FROM news_tweets WHERE processed = 1 AND (llm_analysis IS NULL OR llm_analysis = 'null');"
 
-                async with aiosqlite.connect(self.db_path) as db_count:
+                async with self._sqlite_connect() as db_count:
                     async with db_count.execute(count_sql_unprocessed) as cursor_c_u:
                         result_unprocessed = await cursor_c_u.fetchone()
                         unprocessed_count = result_unprocessed[0] if result_unprocessed else 0
@@ -277,7 +377,7 @@ class NewsRepository:
                 ORDER BY fetched_at DESC 
                 LIMIT ?;
                 """
-                async with aiosqlite.connect(self.db_path) as db:
+                async with self._sqlite_connect() as db:
                     db.row_factory = aiosqlite.Row
                     async with db.execute(sql, (limit,)) as cursor:
                         rows = await cursor.fetchall()
@@ -287,17 +387,17 @@ class NewsRepository:
             # Return empty list on error, let caller handle
         return tweets
 
-    async def update_tweet_analysis(
+    def _build_analysis_update(
         self,
         original_tweet_id: str,
-        status: str, 
-        analysis_data: Optional[Dict[str, Any]] = None, 
-        error_message: Optional[str] = None 
-    ):
-        """Update analysis fields and processing status based on provided status."""
+        status: str,
+        analysis_data: Optional[Dict[str, Any]] = None,
+        error_message: Optional[str] = None
+    ) -> Optional[Tuple[str, tuple]]:
+        """Build the UPDATE statement and parameters for update_tweet_analysis(), or None if invalid."""
         if not original_tweet_id:
             logger.warning("Attempted to update analysis with missing original_tweet_id.")
-            return False
+            return None
 
         update_fields_set = []
         params_list = []
@@ -311,7 +411,7 @@ class NewsRepository:
             # Store raw LLM analysis (if primarily from Groq and available)
             # analysis_data itself is the dict from _analyze_content_with_llm
             update_fields_set.append("llm_analysis = %s" if self.is_postgres else "llm_analysis = ?")
-            params_list.append(json.dumps(analysis_data))
+            params_list.append(_json_dumps(analysis_data))
 
             sentiment_label = analysis_data.get("sentiment")
             significance_label = analysis_data.get("significance")
@@ -327,27 +427,11 @@ class NewsRepository:
             update_fields_set.append("sentiment_source = %s" if self.is_postgres else "sentiment_source = ?")
             params_list.append(sentiment_src)
 
-            # Map sentiment label to score
-            sentiment_score_val = None
-            if sentiment_label == "Positive":
-                sentiment_score_val = 0.7
-            elif sentiment_label == "Negative":
-                sentiment_score_val = -0.7
-            elif sentiment_label == "Neutral":
-                sentiment_score_val = 0.0
+            # Map labels to scores; unknown labels store NULL
             update_fields_set.append("sentiment_score = %s" if self.is_postgres else "sentiment_score = ?")
-            params_list.append(sentiment_score_val)
-
-            # Map significance label to score
-            significance_score_val = None
-            if significance_label == "High":
-                significance_score_val = 1.0
-            elif significance_label == "Medium":
-                significance_score_val = 0.5
-            elif significance_label == "Low":
-                significance_score_val = 0.1
+            params_list.append(_SENTIMENT_SCORES.get(sentiment_label))
             update_fields_set.append("significance_score = %s" if self.is_postgres else "significance_score = ?")
-            params_list.append(significance_score_val)
+            params_list.append(_SIGNIFICANCE_SCORES.get(significance_label))
 
         elif status in ["analysis_failed", "analysis_timeout"]:
             update_fields_set.append("processed = %s" if self.is_postgres else "processed = ?")
@@ -364,11 +448,11 @@ class NewsRepository:
             # Other analysis fields will remain NULL or their defaults
         else:
              logger.warning(f"Invalid status '{status}' provided for tweet {original_tweet_id}. Not updating.")
-             return False
+             return None
 
         if not update_fields_set:
             logger.warning(f"No fields to update for tweet {original_tweet_id} with status {status}. This might indicate an issue.")
-            return False
+            return None
 
         params_list.append(original_tweet_id) 
 
@@ -381,24 +465,40 @@ class NewsRepository:
             SET {', '.join(update_fields_set)}
             WHERE original_tweet_id = ?
             """
+        return sql_query, tuple(params_list)
+
+    async def update_tweet_analysis(
+        self,
+        original_tweet_id: str,
+        status: str, 
+        analysis_data: Optional[Dict[str, Any]] = None, 
+        error_message: Optional[str] = None 
+    ):
+        """Update analysis fields and processing status based on provided status."""
+        update = self._build_analysis_update(original_tweet_id, status, analysis_data, error_message)
+        if update is None:
+            return False
+        sql_query, params = update
 
         try:
             rows_affected = 0
             if self.is_postgres:
                 conn = self._get_postgres_connection()
                 cursor = conn.cursor()
-                cursor.execute(sql_query, tuple(params_list))
+                cursor.execute(sql_query, params)
                 rows_affected = cursor.rowcount
                 conn.commit()
                 cursor.close()
                 conn.close()
             else:
-                async with aiosqlite.connect(self.db_path) as db:
-                    cursor = await db.execute(sql_query, tuple(params_list))
+                async with self._sqlite_connect() as db:
+                    cursor = await db.execute(sql_query, params)
                     await db.commit()
                     rows_affected = cursor.rowcount
             
             if rows_affected > 0:
+                # New analysis results may change which news item gets posted
+                clear_top_news_cache()
                 logger.debug(f"Successfully updated status for tweet {original_tweet_id} to {status}.")
                 return True
             else:
@@ -408,4 +508,61 @@ class NewsRepository:
             logger.error(f"Error updating analysis status for tweet {original_tweet_id}: {e}", exc_info=True)
             return False
 
+    async def update_tweet_analysis_batch(
+        self,
+        updates: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[str]]]
+    ) -> Dict[str, int]:
+        """Apply many update_tweet_analysis() calls in one transaction.
+
+        Each update is (original_tweet_id, status, analysis_data, error_message). Updates
+        sharing an UPDATE statement go through one executemany. Returns the number of rows
+        updated per status; on error nothing is committed and an empty dict is returned.
+        """
+        # SQL text -> (status, [params, ...]); the SET clause depends only on the status
+        grouped: Dict[str, Tuple[str, List[tuple]]] = {}
+        for original_tweet_id, status, analysis_data, error_message in updates:
+            update = self._build_analysis_update(original_tweet_id, status, analysis_data, error_message)
+            if update is None:
+                continue
+            sql_query, params = update
+            grouped.setdefault(sql_query, (status, []))[1].append(params)
+        if not grouped:
+            return {}
+
+        rows_by_status: Dict[str, int] = {}
+        try:
+            if self.is_postgres:
+                conn = self._get_postgres_connection()
+                try:
+                    with conn.cursor() as cursor:
+                        for sql_query, (status, params_rows) in grouped.items():
+                            cursor.executemany(sql_query, params_rows)
+                            rows_by_status[status] = rows_by_status.get(status, 0) + max(cursor.rowcount, 0)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.close()
+            else:
+                async with self._sqlite_connect() as db:
+                    await db.execute("BEGIN IMMEDIATE")
+                    try:
+                        for sql_query, (status, params_rows) in grouped.items():
+                            cursor = await db.executemany(sql_query, params_rows)
+                            rows_by_status[status] = rows_by_status.get(status, 0) + max(cursor.rowcount, 0)
+                        await db.commit()
+                    except Exception:
+                        await db.rollback()
+                        raise
+        except Exception as e:
+            logger.error(f"Error applying batch of {len(updates)} analysis updates: {e}", exc_info=True)
+            return {}
+
+        if any(rows_by_status.values()):
+            # New analysis results may change which news item gets posted
+            clear_top_news_cache()
+        logger.debug(f"Batch analysis update: {rows_by_status}")
+        return rows_by_status
+
     # Add other news-related methods if necessary, e.g., getting analyzed tweets for display 
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Shared SQLite connection for repositories used together in one unit of work.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+# Setup logger
+logger = logging.getLogger(__name__)
+
+try:
+    import aiosqlite
+    AIOSQLITE_AVAILABLE = True
+except ImportError:
+    AIOSQLITE_AVAILABLE = False
+
+# Applied once when the shared connection is opened
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-20000;",
+    "PRAGMA busy_timeout=5000;",
+)
+
+class SqlitePool:
+    """Lazily opens one aiosqlite connection and hands it out under a lock.
+
+    Database, NewsRepository and ContentRepository accept an optional ``pool``
+    so a single posting run opens (and tunes) the SQLite file once instead of
+    once per query. The owner must call ``close()``: aiosqlite runs each
+    connection on a non-daemon thread.
+    """
+
+    def __init__(self, db_path: str):
+        if not AIOSQLITE_AVAILABLE:
+            raise RuntimeError("SqlitePool requires aiosqlite, which is not installed.")
+        self.db_path = db_path
+        self._conn: Optional["aiosqlite.Connection"] = None
+        self._lock = asyncio.Lock()
+
+    async def _open(self) -> "aiosqlite.Connection":
+        conn = await aiosqlite.connect(self.db_path)
+        for pragma in _SQLITE_PRAGMAS:
+            await conn.execute(pragma)
+        logger.debug(f"Opened shared SQLite connection to {self.db_path}")
+        return conn
+
+    @asynccontextmanager
+    async def connection(self):
+        """Yield the shared connection; drop-in for ``async with aiosqlite.connect(...)``."""
+        async with self._lock:
+            if self._conn is None:
+                self._conn = await self._open()
+            try:
+                yield self._conn
+            except BaseException:
+                # Don't leave a half-finished transaction for the next caller
+                await self._conn.rollback()
+                raise
+            finally:
+                # Callers set row_factory per query; reset it for the next one
+                self._conn.row_factory = None
+
+    async def close(self):
+        """Close the shared connection if it was opened. Safe to call more than once."""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.error(f"Error closing shared SQLite connection: {e}", exc_info=True)
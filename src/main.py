@@ -1,15 +1,16 @@
 import asyncio
 import os
 from datetime import datetime
-import traceback
 import logging
-import json
 import sys
+import time
+from functools import lru_cache
 
 from src.price_fetcher import PriceFetcher
 from src.database import Database
 from src.db.news_repo import NewsRepository
 from src.db.content_repo import ContentRepository
+from src.db.pool import SqlitePool
 from src.twitter_client import TwitterClient
 from src.content_manager import ContentManager
 from src.config import Config
@@ -18,63 +19,154 @@ from src.telegram_poster import send_telegram_message
 
 logger = logging.getLogger(__name__)
 
+# News significance score thresholds used when picking news for a post
+HIGH_SIG_SCORE_THRESHOLD = 0.8 # "High": used regardless of sentiment
+MEDIUM_SIG_SCORE_THRESHOLD = 0.4 # "Medium": needs Positive/Neutral, non-VADER-fallback sentiment
+
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the process-wide Config, parsing the environment only once.
+
+    Call get_config.cache_clear() to pick up changed environment variables.
+    """
+    return Config()
+
+# The last successful post from this process is remembered so repeat runs
+# inside config.duplicate_post_check_minutes can skip without querying the database.
+_last_post_monotonic = None
+
+# Shared PriceFetcher so the CoinGecko keep-alive connection survives across posts
+_price_fetcher = None
+_price_fetcher_loop = None
+
+async def get_price_fetcher() -> PriceFetcher:
+    """Return the shared, already-entered PriceFetcher for the running event loop."""
+    global _price_fetcher, _price_fetcher_loop
+    loop = asyncio.get_running_loop()
+    if _price_fetcher is not None and _price_fetcher_loop is loop:
+        return _price_fetcher
+    # aiohttp sessions are bound to the loop that created them, so start fresh on a new loop
+    _price_fetcher = await PriceFetcher().__aenter__()
+    _price_fetcher_loop = loop
+    return _price_fetcher
+
+async def close_price_fetcher():
+    """Close the shared PriceFetcher session, if one was opened on the running loop."""
+    global _price_fetcher, _price_fetcher_loop
+    fetcher, fetcher_loop = _price_fetcher, _price_fetcher_loop
+    _price_fetcher = None
+    _price_fetcher_loop = None
+    if fetcher is not None and fetcher_loop is asyncio.get_running_loop():
+        try:
+            await fetcher.__aexit__(None, None, None)
+        except Exception as e:
+            logger.error("Error closing shared PriceFetcher: %s", e, exc_info=True)
+
+@lru_cache(maxsize=1)
+def get_twitter_client(api_key: str, api_secret: str, access_token: str, access_token_secret: str) -> TwitterClient:
+    """Return a shared TwitterClient so tweepy's HTTP session (and keep-alive) survives across posts."""
+    return TwitterClient(api_key, api_secret, access_token, access_token_secret)
+
+# Last CoinGecko result as (time bucket, price dict). CoinGecko only refreshes every
+# 30-60s, so runs inside the same bucket reuse it instead of making another request.
+_price_cache = None
+_price_cache_lock = asyncio.Lock()
+
+async def get_btc_price_cached(price_fetcher: PriceFetcher, config: Config) -> dict:
+    """Fetch the BTC price, reusing the last result within config.price_cache_ttl_seconds."""
+    global _price_cache
+    ttl = config.price_cache_ttl_seconds
+    if ttl <= 0:
+        return await price_fetcher.get_btc_price_with_retry(config.coingecko_retry_limit)
+    async with _price_cache_lock:
+        bucket = int(time.time() // ttl)
+        if _price_cache is not None and _price_cache[0] == bucket:
+            logger.debug("Using cached BTC price")
+            return dict(_price_cache[1])
+        price_data = await price_fetcher.get_btc_price_with_retry(config.coingecko_retry_limit)
+        # A failed fetch returns {"usd": 0.0}; don't pin that for the rest of the bucket
+        if price_data.get("usd", 0) > 0:
+            _price_cache = (bucket, dict(price_data))
+        return price_data
+
+# Fixed tweet pieces for the quote/joke and price-only formats
+_PRICE_UP_EMOJI = "📈"
+_PRICE_DOWN_EMOJI = "📉"
+_CONTENT_HASHTAGS = "#Bitcoin #Crypto"
+_PRICE_HASHTAGS = "#Bitcoin #Price"
+
+def _format_price_line(current_price: float, price_change: float) -> str:
+    """First tweet line: price, percentage change and an up/down emoji."""
+    emoji = _PRICE_UP_EMOJI if price_change >= 0 else _PRICE_DOWN_EMOJI
+    return f"BTC: ${current_price:,.2f} | {price_change:+.2f}% {emoji}"
+
+# (significance, sentiment) -> (emoji, body line) for news tweets. Significance other than
+# high/medium is treated as "low", sentiment other than positive/negative as "neutral".
+_NEWS_TWEET_TEMPLATES = {
+    ("high", "positive"): ("🚀", "🔥 BIG NEWS for #Bitcoin! {summary} #CryptoNews"),
+    ("high", "negative"): ("⚠️", "🚨 Critical #Bitcoin Update! {summary} #CryptoAlert"),
+    ("high", "neutral"): ("📰", "📢 Key #Bitcoin Development: {summary} #BTCNews"),
+    ("medium", "positive"): ("📈", "👍 Positive #Bitcoin Signal: {summary} #Crypto"),
+    ("medium", "negative"): ("📉", "❗ Notable #Bitcoin Update (Caution): {summary} #BTC"), # Could also be a more neutral warning for medium sig
+    ("medium", "neutral"): ("📊", "🔍 #Bitcoin Update: {summary} #CryptoReport"),
+    # Simpler template for low significance
+    ("low", "positive"): ("💡", "{summary} #Bitcoin"),
+    ("low", "negative"): ("🧐", "{summary} #Bitcoin"),
+    ("low", "neutral"): ("➡️", "{summary} #Bitcoin"),
+}
+_NEWS_TWEET_FORMAT = "BTC: ${price:,.2f} | {change:+.2f}% {emoji}\n{body}"
+
 def _format_news_tweet(current_price: float, price_change: float, news_item: dict) -> str:
     """Formats a tweet string based on news significance and sentiment."""
     summary = news_item.get('summary', "No summary available.")
-    significance = news_item.get('significance_label', "Medium").lower()
-    sentiment = news_item.get('sentiment_label', "Neutral").lower()
-
-    emoji = ""
-    template = ""
-
-    # Base price string
-    price_str = f"BTC: ${current_price:,.2f} | {price_change:+.2f}%"
-
-    if significance == "high":
-        if sentiment == "positive":
-            emoji = "🚀"
-            template = f"{price_str} {emoji}\n🔥 BIG NEWS for #Bitcoin! {summary} #CryptoNews"
-        elif sentiment == "negative":
-            emoji = "⚠️"
-            template = f"{price_str} {emoji}\n🚨 Critical #Bitcoin Update! {summary} #CryptoAlert"
-        else: # Neutral or other
-            emoji = "📰"
-            template = f"{price_str} {emoji}\n📢 Key #Bitcoin Development: {summary} #BTCNews"
-    elif significance == "medium":
-        if sentiment == "positive":
-            emoji = "📈"
-            template = f"{price_str} {emoji}\n👍 Positive #Bitcoin Signal: {summary} #Crypto"
-        elif sentiment == "negative":
-            emoji = "📉" # Could also be a more neutral warning for medium sig
-            template = f"{price_str} {emoji}\n❗ Notable #Bitcoin Update (Caution): {summary} #BTC"
-        else: # Neutral or other
-            emoji = "📊"
-            template = f"{price_str} {emoji}\n🔍 #Bitcoin Update: {summary} #CryptoReport"
-    else: # Low significance or undefined
-        if sentiment == "positive":
-            emoji = "💡"
-        elif sentiment == "negative":
-            emoji = "🧐"
+    significance = news_item.get('significance_label', "Medium").casefold()
+    sentiment = news_item.get('sentiment_label', "Neutral").casefold()
+
+    if significance not in ("high", "medium"):
+        significance = "low"
+    if sentiment not in ("positive", "negative"):
+        sentiment = "neutral"
+    emoji, body = _NEWS_TWEET_TEMPLATES[(significance, sentiment)]
+
+    logger.debug("Formatted news tweet - Significance: %s, Sentiment: %s, Emoji: %s", significance, sentiment, emoji)
+    return _NEWS_TWEET_FORMAT.format(price=current_price, change=price_change, emoji=emoji,
+                                     body=body.format(summary=summary))
+
+# Discord/Telegram sends still in flight; held here so they aren't garbage collected
+_background_sends = set()
+
+async def _send_and_log(platform: str, send_coro):
+    """Await a Discord/Telegram send and log the outcome. Never raises."""
+    try:
+        if await send_coro:
+            logger.info("Successfully posted message to %s.", platform)
         else:
-            emoji = "➡️"
-        # Simpler template for low significance
-        template = f"{price_str} {emoji}\n{summary} #Bitcoin"
+            logger.warning("Failed to post message to %s.", platform)
+    except Exception as e:
+        logger.error("Error posting message to %s: %s", platform, e, exc_info=True)
 
-    # Log the chosen template parts for debugging
-    template_lines = template.split('\n')
-    log_template_preview = template_lines[1][:50] if len(template_lines) > 1 else template_lines[0][:50]
-    logger.debug(f"Formatted news tweet - Significance: {significance}, Sentiment: {sentiment}, Emoji: {emoji}, Template used: {log_template_preview}...")
-    return template
+def _send_in_background(platform: str, send_coro):
+    """Run a Discord/Telegram send without making the caller wait for it."""
+    task = asyncio.create_task(_send_and_log(platform, send_coro))
+    _background_sends.add(task)
+    task.add_done_callback(_background_sends.discard)
+
+async def wait_for_background_sends():
+    """Wait for pending Discord/Telegram sends, e.g. before a one-shot asyncio.run() exits."""
+    loop = asyncio.get_running_loop()
+    pending = [task for task in _background_sends if task.get_loop() is loop]
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
 
 async def post_direct_tweet():
     """Post a direct tweet without database dependencies"""
     logger.info("Starting direct tweet posting (fallback)...")
     
     # Initialize configuration
-    config = Config()
+    config = get_config()
     
     # Initialize Twitter client
-    twitter = TwitterClient(
+    twitter = get_twitter_client(
         config.twitter_api_key,
         config.twitter_api_secret,
         config.twitter_access_token,
@@ -83,10 +175,10 @@ async def post_direct_tweet():
     
     try:
         # Fetch current BTC price
-        async with PriceFetcher() as pf:
-            price_data = await pf.get_btc_price_with_retry(config.coingecko_retry_limit)
-            current_price = price_data["usd"]
-            logger.info(f"Direct tweet fallback: Current BTC price: ${current_price:,.2f}")
+        pf = await get_price_fetcher()
+        price_data = await get_btc_price_cached(pf, config)
+        current_price = price_data["usd"]
+        logger.info("Direct tweet fallback: Current BTC price: $%.2f", current_price)
         
         # Use a hardcoded quote since we don't have DB access
         content = {
@@ -95,71 +187,101 @@ async def post_direct_tweet():
             "category": "motivational"
         }
         
-        # Format tweet
-        emoji = "📈"  # Always use up emoji for first tweet
-        tweet = f"BTC: ${current_price:,.2f} {emoji}\n{content['text']}\n#Bitcoin #Crypto"
+        # Format tweet (always use up emoji, there is no previous price to compare)
+        tweet = f"BTC: ${current_price:,.2f} {_PRICE_UP_EMOJI}\n{content['text']}\n{_CONTENT_HASHTAGS}"
         
         # Post tweet
-        logger.info(f"Direct tweet fallback: Posting tweet: {tweet}")
+        logger.info("Direct tweet fallback: Posting tweet: %s", tweet)
         tweet_id = await twitter.post_tweet(tweet)
         
         if tweet_id:
-            logger.info(f"Direct tweet fallback: Successfully posted tweet with ID: {tweet_id}")
+            logger.info("Direct tweet fallback: Successfully posted tweet with ID: %s", tweet_id)
             return tweet_id
         else:
             logger.warning("Direct tweet fallback: Failed to post tweet - no tweet ID returned")
             return None
     
     except Exception as e:
-        logger.error(f"Direct tweet fallback: Error posting update: {e}", exc_info=True)
-        traceback.print_exc()
+        logger.error("Direct tweet fallback: Error posting update: %s", e, exc_info=True)
         return None
 
 async def post_btc_update(config=None, scheduled_time_str=None):
     """Fetch BTC price and post update to Twitter based on schedule."""
+    global _last_post_monotonic
     # Initialize configuration
     if config is None:
-        config = Config()
+        config = get_config()
 
+    duplicate_post_minutes = config.duplicate_post_check_minutes
     db = None # Initialize db variable
+    pool = None # Shared SQLite connection for this run (unused with PostgreSQL)
     try:
-        logger.info(f"Running post_btc_update for scheduled time: {scheduled_time_str or 'Unspecified'}")
-        logger.info(f"Initializing database/repositories for post_btc_update...")
+        logger.info("Running post_btc_update for scheduled time: %s", scheduled_time_str or 'Unspecified')
+        if (_last_post_monotonic is not None
+                and time.monotonic() - _last_post_monotonic < duplicate_post_minutes * 60):
+            # This process posted recently; skip before any network or database work
+            logger.warning("Skipping post: This process already posted a tweet in the last %d minutes.", duplicate_post_minutes)
+            return None
+
+        logger.info("Initializing database/repositories for post_btc_update...")
         
         # Initialize database and repositories
-        db = Database(config.sqlite_db_path) 
-        news_repo = NewsRepository(config.sqlite_db_path)
-        content_manager = ContentManager(config.sqlite_db_path)
+        if not config.use_postgres:
+            pool = SqlitePool(config.sqlite_db_path)
+        db = Database(config.sqlite_db_path, pool=pool)
+        news_repo = NewsRepository(config.sqlite_db_path, pool=pool)
+        content_manager = ContentManager(config.sqlite_db_path, pool=pool)
         
-        price_fetcher = PriceFetcher()
-        twitter = TwitterClient(
+        price_fetcher = await get_price_fetcher()
+        twitter = get_twitter_client(
             config.twitter_api_key,
             config.twitter_api_secret,
             config.twitter_access_token,
             config.twitter_access_token_secret
         )
         
+        current_price = None
+        price_stored = False
         try:
             # Fetch current BTC price
-            logger.info("Fetching BTC price...")
-            async with price_fetcher as pf:
-                price_data = await pf.get_btc_price_with_retry(config.coingecko_retry_limit)
-                current_price = price_data["usd"]
-                logger.info(f"Current BTC price: ${current_price:,.2f}")
+            # Price fetch (network), previous price and recent news (DB) are independent,
+            # so overlap them. News errors are handled by the selection logic below.
+            logger.info("Fetching BTC price, latest stored price, recent posts and recent news...")
+            NEWS_HOURS_LIMIT = config.news_hours_limit # Get from config
+            price_data, price_and_post_state, recent_news_result = await asyncio.gather(
+                get_btc_price_cached(price_fetcher, config),
+                db.get_latest_price_and_recent_post(minutes=duplicate_post_minutes),
+                news_repo.get_top_significant_news(
+                    hours_limit=NEWS_HOURS_LIMIT,
+                    high_threshold=HIGH_SIG_SCORE_THRESHOLD,
+                    medium_threshold=MEDIUM_SIG_SCORE_THRESHOLD
+                ),
+                return_exceptions=True
+            )
+            for result in (price_data, price_and_post_state):
+                if isinstance(result, BaseException):
+                    raise result
+            latest_price_data, posted_recently = price_and_post_state
+            current_price = price_data["usd"]
+            logger.info("Current BTC price: $%.2f", current_price)
             
-            # Get latest price from database for comparison
-            logger.info("Fetching latest price from database...")
-            latest_price_data = await db.get_latest_price()
+            # --- START Duplicate Check ---
+            logger.info("Checking for recent posts...")
+            if posted_recently:
+                logger.warning("Skipping post: A tweet was already posted successfully in the last %d minutes.", duplicate_post_minutes)
+                return None # Indicate skipped post
+            # --- END Duplicate Check ---
+            
+            # Compare against the latest price stored before this run
             previous_price = latest_price_data["price"] if latest_price_data else current_price
-            logger.info(f"Previous BTC price: ${previous_price:,.2f}")
+            logger.info("Previous BTC price: $%.2f", previous_price)
             
             # Calculate price change
             price_change = price_fetcher.calculate_price_change(current_price, previous_price)
-            logger.info(f"Price change: {price_change:+.2f}%")
+            logger.info("Price change: %+.2f%%", price_change)
             
-            # Store new price in database
-            logger.info("Storing new price in database...")
-            await db.store_price(current_price)
+            # The new price is written together with the post log once the tweet is out,
+            # or on its own in the finally block below if no post is made.
             
             # --- Determine Tweet Content based on Schedule ---
             tweet = ""
@@ -167,66 +289,24 @@ async def post_btc_update(config=None, scheduled_time_str=None):
             use_fallback_content = True # Assume fallback unless suitable news found
 
             # For ALL scheduled times, try to use news summary first
-            logger.info(f"Scheduled time is {scheduled_time_str or 'other'}. Checking for suitable news...")
+            logger.info("Scheduled time is %s. Checking for suitable news...", scheduled_time_str or 'other')
             selected_news_content = None # Will store dict of the selected news item
-            NEWS_HOURS_LIMIT = config.news_hours_limit # Get from config
 
-            # Define Significance Score Thresholds (Consider making these configurable)
-            HIGH_SIG_SCORE_THRESHOLD = 0.8 # e.g., for "High"
-            MEDIUM_SIG_SCORE_THRESHOLD = 0.4 # e.g., for "Medium"
-            # LOW_SIG_SCORE_THRESHOLD = 0.1 # Not explicitly used if we iterate top-down
-            
             try:
-                recent_analyzed_news = await news_repo.get_recent_analyzed_news(hours_limit=NEWS_HOURS_LIMIT)
-                logger.info(f"Found {len(recent_analyzed_news)} recently analyzed news items for potential use.")
-
-                for news_item in recent_analyzed_news:
-                    # news_item is now a dict with structured fields from get_recent_analyzed_news
-                    sig_score = news_item.get('significance_score')
-                    sentiment_label = news_item.get('sentiment_label')
-                    summary = news_item.get('summary')
-                    news_text = news_item.get('text') # Full text for context if needed
-                    sentiment_source = news_item.get('sentiment_source')
-                    original_tweet_id = news_item.get('original_tweet_id')
-
-                    if not summary: # Essential for the tweet
-                        logger.debug(f"Skipping news {original_tweet_id}: missing summary.")
-                        continue
-                    
-                    logger.debug(f"Evaluating news {original_tweet_id}: Sig Score: {sig_score}, Sentiment: {sentiment_label}, Source: {sentiment_source}")
-
-                    # Decision logic based on significance and sentiment
-                    use_this_news = False
-                    if sig_score is not None:
-                        if sig_score >= HIGH_SIG_SCORE_THRESHOLD:
-                            use_this_news = True
-                            logger.info(f"Selected news {original_tweet_id} due to HIGH significance ({sig_score}).")
-                        elif sig_score >= MEDIUM_SIG_SCORE_THRESHOLD:
-                            if sentiment_label in ["Positive", "Neutral"]:
-                                use_this_news = True
-                                logger.info(f"Selected news {original_tweet_id} due to MEDIUM significance ({sig_score}) and Positive/Neutral sentiment.")
-                            else:
-                                logger.debug(f"Skipping news {original_tweet_id}: MEDIUM significance but sentiment ({sentiment_label}) not Positive/Neutral.")
-                        # else: (Low significance)
-                            # logger.debug(f"Skipping news {original_tweet_id}: LOW significance ({sig_score}).")
-                    
-                    # Optional: Add stricter rules if sentiment_source is a fallback
-                    if use_this_news and sentiment_source and "vader_fallback" in sentiment_source:
-                        # Example: only use if HIGH significance for VADER fallbacks
-                        if sig_score < HIGH_SIG_SCORE_THRESHOLD:
-                            logger.info(f"De-selecting news {original_tweet_id}: VADER fallback sentiment and not HIGH significance.")
-                            use_this_news = False
-
-                    if use_this_news:
-                        selected_news_content = news_item # Store the whole dict
-                        break # Found suitable news, stop iterating
-                
-                if not selected_news_content:
-                    logger.info("No suitable news item found after evaluating recent analyses.")
+                if isinstance(recent_news_result, BaseException):
+                    raise recent_news_result
+                # Significance/sentiment rules are applied in SQL; at most one row comes back
+                selected_news_content = recent_news_result
+                if selected_news_content:
+                    logger.info("Selected news %s (significance %s, sentiment %s).",
+                                selected_news_content.get('original_tweet_id'),
+                                selected_news_content.get('significance_score'),
+                                selected_news_content.get('sentiment_label'))
+                else:
+                    logger.info("No suitable news item found among recent analyses.")
 
             except Exception as e_news_select:
-                 logger.error(f"Error during news selection logic: {e_news_select}", exc_info=True)
-                 # Ensure selected_news_content remains None or is reset if error occurs mid-selection
+                 logger.error("Error during news selection logic: %s", e_news_select, exc_info=True)
                  selected_news_content = None 
 
             # --- Generate tweet based on whether suitable news was found ---
@@ -235,77 +315,65 @@ async def post_btc_update(config=None, scheduled_time_str=None):
                 tweet = _format_news_tweet(current_price, price_change, selected_news_content)
                 content_type = 'news_summary' # Keep track of content type
                 use_fallback_content = False
-                logger.info(f"Using formatted news tweet (Original ID: {selected_news_content.get('original_tweet_id')}).")
+                logger.info("Using formatted news tweet (Original ID: %s).", selected_news_content.get('original_tweet_id'))
             
             if use_fallback_content:
                 logger.info("No suitable news found or fallback explicitly required. Falling back to random content.")
                 content = await content_manager.get_random_content()
+                # For fallback content, emoji is based purely on price change
+                price_line = _format_price_line(current_price, price_change)
                 if content:
-                    # For fallback content, emoji is based purely on price change
-                    emoji = "📈" if price_change >= 0 else "📉"
-                    tweet = f"BTC: ${current_price:,.2f} | {price_change:+.2f}% {emoji}\n{content['text']}\n#Bitcoin #Crypto"
+                    tweet = "\n".join((price_line, content['text'], _CONTENT_HASHTAGS))
                     content_type = content["type"]
                 else:
                     logger.warning("Failed to get random content. Falling back to price-only tweet.")
-                    emoji = "📈" if price_change >= 0 else "📉"
-                    tweet = f"BTC: ${current_price:,.2f} | {price_change:+.2f}% {emoji}\n#Bitcoin #Price"
+                    tweet = "\n".join((price_line, _PRICE_HASHTAGS))
                     content_type = "price_fallback"
 
             # --- END Content Determination ---
-            logger.debug(f"Generated tweet content: {tweet}")
+            logger.debug("Generated tweet content: %s", tweet)
 
-            # --- START Duplicate Check ---
-            logger.info("Checking for recent posts...")
-            if await db.has_posted_recently(minutes=5):
-                logger.warning("Skipping post: A tweet was already posted successfully in the last 5 minutes.")
-                return None # Indicate skipped post
-            # --- END Duplicate Check ---
-            
             # Post to Twitter
             logger.info("Posting to Twitter...")
             tweet_id = await twitter.post_tweet(tweet)
             
             if tweet_id:
-                logger.info(f"Successfully posted tweet with ID: {tweet_id}")
+                logger.info("Successfully posted tweet with ID: %s", tweet_id)
+                _last_post_monotonic = time.monotonic()
                 
-                # Log the post to the database
+                # Store the price and log the post to the database in one transaction
                 try:
-                    logger.info(f"Attempting to log post {tweet_id} to database (CONTENT: {content_type}, TWEET_TEXT: {tweet[:50]}...).")
-                    await db.log_post(
+                    logger.info("Attempting to log post %s to database (CONTENT: %s, TWEET_TEXT: %.50s...).", tweet_id, content_type, tweet)
+                    post_row_id = await db.log_post_with_price(
                         tweet_id=tweet_id,
                         tweet=tweet, # The actual text content of the tweet
                         price=current_price,
                         price_change=price_change,
                         content_type=content_type
                     )
-                    logger.info(f"Successfully logged post {tweet_id} to database after call.")
+                    if post_row_id == -1:
+                        logger.error("Failed to log post %s to database.", tweet_id)
+                    else:
+                        price_stored = True
+                        logger.info("Successfully logged post %s to database after call.", tweet_id)
                 except Exception as log_err:
-                    logger.error(f"Failed to log post {tweet_id} to database: {log_err}", exc_info=True)
+                    logger.error("Failed to log post %s to database: %s", tweet_id, log_err, exc_info=True)
 
-                # Post to Discord if enabled
+                # Mirror to Discord/Telegram in the background; the tweet is already out
                 if config.enable_discord_posting:
                     logger.info("Discord posting enabled. Sending message...")
-                    discord_success = await send_discord_message(
+                    _send_in_background("Discord", send_discord_message(
                         config.discord_webhook_url,
                         tweet
-                    )
-                    if discord_success:
-                        logger.info("Successfully posted message to Discord.")
-                    else:
-                        logger.warning("Failed to post message to Discord.")
+                    ))
                 
-                # Post to Telegram if enabled
                 if config.enable_telegram_posting:
                     logger.info("Telegram posting enabled. Sending message...")
-                    telegram_success = await send_telegram_message(
+                    _send_in_background("Telegram", send_telegram_message(
                         config.telegram_bot_token,
                         config.telegram_chat_id,
                         tweet
-                    )
-                    if telegram_success:
-                        logger.info("Successfully posted message to Telegram.")
-                    else:
-                        logger.warning("Failed to post message to Telegram.")
+                    ))
                 
                 return tweet_id
             else:
@@ -313,38 +381,39 @@ async def post_btc_update(config=None, scheduled_time_str=None):
                 return None
                 
         except Exception as e:
-            logger.error(f"Error in post_btc_update: {e}", exc_info=True)
-            traceback.print_exc()
+            logger.error("Error in post_btc_update: %s", e, exc_info=True)
             return None
+        
+        finally:
+            # Keep the price history complete even when nothing was posted
+            if current_price is not None and not price_stored:
+                logger.info("Storing new price in database...")
+                await db.store_price(current_price)
             
     except Exception as e:
-        logger.error(f"Database connection or other critical error in post_btc_update: {e}", exc_info=True)
+        logger.error("Database connection or other critical error in post_btc_update: %s", e, exc_info=True)
         logger.info("Falling back to direct tweet posting...")
         
-        # Fall back to direct tweet posting without database
-        # Ensure db is closed even if we fallback
-        if db and hasattr(db, 'close'):
-            try:
-                await db.close() # Assuming db.close() might be async now?
-            except Exception as close_err:
-                logger.error(f"Error closing DB connection during outer exception handling: {close_err}")
+        # Fall back to direct tweet posting without database (the finally block closes db)
         return await post_direct_tweet()
     
     finally:
-        # Ensure database connection is closed
+        # Single close path for both the normal and the fallback exit
         if db and hasattr(db, 'close'):
             try:
                 logger.info("Closing database connection for post_btc_update...")
                 await db.close() # Assuming db.close() might be async now?
             except Exception as close_err:
-                 logger.error(f"Error closing DB connection in finally block: {close_err}")
+                 logger.error("Error closing DB connection in finally block: %s", close_err)
+        if pool:
+            await pool.close()
 
 
 async def setup_database():
     """Set up the database with initial content"""
     # This function primarily uses ContentManager now
     try:
-        config = Config()
+        config = get_config()
         logger.info("Running database setup...")
         # ContentManager uses ContentRepository internally
         cm = ContentManager(config.sqlite_db_path)
@@ -363,7 +432,11 @@ async def main():
         logger.error(f"Database setup failed: {e}", exc_info=True)
     
     # Post BTC update (Example call, usually run by scheduler)
-    await post_btc_update()
+    try:
+        await post_btc_update()
+        await wait_for_background_sends()
+    finally:
+        await close_price_fetcher()
 
 if __name__ == "__main__":
     # Run the main function
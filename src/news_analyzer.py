@@ -7,6 +7,9 @@ import os
 import sys
 import asyncio
 import json # Import json module
+import re
+import hashlib
+from collections import OrderedDict
 from typing import List, Dict, Any, Tuple, Optional
 
 # Ensure src is in the path if running directly
@@ -14,14 +17,6 @@ if 'src' not in sys.path and os.path.exists('src'):
      sys.path.insert(0, os.path.abspath('.'))
 
 # Project Imports
-try:
-    from src.database import Database # Keep for type hint? Or remove if not passed?
-    DATABASE_CLASS_AVAILABLE = True
-except ImportError as e:
-    DATABASE_CLASS_AVAILABLE = False
-    print(f"Error importing Database from src.database: {e}. NewsAnalyzer may have issues.")
-    Database = None # Placeholder
-
 # Import NewsRepository
 try:
     from src.db.news_repo import NewsRepository
@@ -37,15 +32,6 @@ from src.content_manager import ContentManager
 # --> ADDED IMPORT
 from src.config import Config
 
-# Remove Config import - no longer needed here
-# try:
-#     from src.config import Config # Import Config
-#     CONFIG_CLASS_AVAILABLE = True
-# except ImportError as e:
-#     CONFIG_CLASS_AVAILABLE = False
-#     print(f"Error importing Config from src.config: {e}. NewsAnalyzer may fail.")
-#     Config = None
-
 # --- Analysis Libraries ---
 # VADER Sentiment
 try:
@@ -57,13 +43,31 @@ except ImportError:
 
 # Groq LLM Client
 try:
-    from groq import Groq, AsyncGroq # Use AsyncGroq for async calls
+    from groq import AsyncGroq # Use AsyncGroq for async calls
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
     print("Warning: groq package not installed. LLM analysis disabled.")
 
-# TODO: Import LLM client if implementing LLM analysis
+# Groq's SDK talks HTTP via httpx; h2 enables HTTP/2 multiplexing on the shared pool
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# orjson parses LLM responses faster; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
 
 logger = logging.getLogger(__name__)
 
@@ -71,28 +75,40 @@ logger = logging.getLogger(__name__)
 # Example keywords that might indicate news (simple approach)
 NEWS_KEYWORDS = ["breaking", "alert", "report", "announced", "launch", "partnership", "regulation", "sec", "etf", "fed"]
 DEFAULT_GROQ_MODEL = "llama3-8b-8192" # Define a default model
+# All NEWS_KEYWORDS as whole words in one case-insensitive pass
+_NEWS_KEYWORD_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, NEWS_KEYWORDS)) + r")\b", re.IGNORECASE)
+
+# --- LLM Pre-filter ---
+# Tweets scoring below the threshold on keyword score + 0.5*|VADER compound| are not sent to
+# Groq unless they are long enough to plausibly carry news on their own.
+DEFAULT_NEWS_LLM_PRIOR_THRESHOLD = 0.1
+NEWS_LLM_PRIOR_MIN_LENGTH = 80
 
 # --- LLM Configuration Defaults ---
-# DEFAULT_LLM_CLASSIFY_TEMP = 0.1 # No longer needed
-# DEFAULT_LLM_CLASSIFY_MAX_TOKENS = 10 # No longer needed
 DEFAULT_LLM_ANALYZE_TEMP = 0.2 # New temp for combined analysis
 DEFAULT_LLM_ANALYZE_MAX_TOKENS = 150 # Adjusted max tokens for JSON + summary
-DEFAULT_LLM_SUMMARIZE_TEMP = 0.5 # Keep for potential separate use? Or remove? Let's remove for now.
-DEFAULT_LLM_SUMMARIZE_MAX_TOKENS = 100 # Keep for potential separate use? Or remove? Let's remove for now.
 DEFAULT_NEWS_ANALYSIS_BATCH_SIZE = 30
+DEFAULT_NEWS_ANALYSIS_MAX_BATCHES = 10 # Back-to-back batches per run_cycle while a backlog remains
+ANALYSIS_FLUSH_SIZE = 25 # Analysis results buffered before writing them to the DB
+DEFAULT_LLM_SUB_BATCH_SIZE = 8 # Tweets per Groq request; 1 sends each tweet on its own
+DEFAULT_GROQ_CONCURRENCY = 8 # Max Groq requests in flight; a batch would otherwise fire them all at once
+GROQ_REQUEST_TIMEOUT_SECONDS = 30.0 # Per attempt; the SDK retries on its own
+GROQ_KEEPALIVE_SECONDS = 30.0 # Keep warm connections across the sub-batches of a cycle
 DEFAULT_NEWS_PROCESSING_TIMEOUT_SECONDS = 300 # Added default for timeout
 
 # --- New Combined Analysis Prompt ---
-_ANALYSIS_PROMPT_JSON = """
-Analyze the provided tweet text about Bitcoin. Determine its significance for Bitcoin news and its overall sentiment towards Bitcoin's impact or price.
-
-Provide your analysis ONLY in JSON format with the following keys:
-- "significance": String. Rate the news significance as "Low", "Medium", or "High".
+_ANALYSIS_FIELD_RULES = """- "significance": String. Rate the news significance as "Low", "Medium", or "High".
     - "High" for major events (regulation, adoption, large price swings >5%, exchange issues, major project launches).
     - "Medium" for notable updates (partnerships, minor technical updates, analyst predictions from reputable sources).
     - "Low" for generic price commentary, memes, minor news, or personal opinions without broad impact.
 - "sentiment": String. Rate the sentiment towards Bitcoin's impact/price as "Positive", "Negative", or "Neutral".
-- "summary": String. Provide a concise one-sentence summary (max 200 chars) of the key information, suitable for context.
+- "summary": String. Provide a concise one-sentence summary (max 200 chars) of the key information, suitable for context."""
+
+_ANALYSIS_PROMPT_JSON = """
+Analyze the provided tweet text about Bitcoin. Determine its significance for Bitcoin news and its overall sentiment towards Bitcoin's impact or price.
+
+Provide your analysis ONLY in JSON format with the following keys:
+""" + _ANALYSIS_FIELD_RULES + """
 
 Tweet Text:
 \"\"\"
@@ -102,6 +118,45 @@ Tweet Text:
 JSON Analysis:
 """
 
+# Fixed text around the tweet; the tweet goes last so the long instruction prefix is identical
+# on every request (provider-side prompt caching can reuse it) and nothing is re-formatted per call
+_ANALYSIS_PROMPT_PREFIX, _ANALYSIS_PROMPT_SUFFIX = _ANALYSIS_PROMPT_JSON.split("{text}")
+
+# Several tweets per request; "id" ties each analysis back to its numbered tweet
+_BATCH_ANALYSIS_PROMPT_JSON = """
+Analyze each numbered tweet about Bitcoin below. For each tweet, determine its significance for Bitcoin news and its overall sentiment towards Bitcoin's impact or price.
+
+Provide your analysis ONLY as a JSON object of the form {{"analyses": [...]}}, with exactly one entry per tweet. Each entry has the key "id" (the tweet's number) and the following keys:
+""" + _ANALYSIS_FIELD_RULES.replace("{", "{{").replace("}", "}}") + """
+
+Tweets:
+{tweets}
+
+JSON Analysis:
+"""
+
+# --- Analysis Cache ---
+# Successful Groq analyses keyed by a hash of the normalized tweet text, so retweets and
+# re-posted headlines seen in later cycles reuse the earlier result.
+ANALYSIS_CACHE_SIZE = 1024
+_URL_OR_MENTION_RE = re.compile(r"https?://\S+|@\w+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def _analysis_cache_key(text: str) -> str:
+    """SHA-256 of the tweet text with case, URLs, mentions, an RT prefix and spacing normalized away."""
+    normalized = _WHITESPACE_RE.sub(" ", _URL_OR_MENTION_RE.sub(" ", text.casefold())).strip()
+    if normalized.startswith("rt "):
+        normalized = normalized[3:].lstrip(": ")
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+def _sentiment_label(compound: float) -> str:
+    """Map a VADER compound score to the Positive/Negative/Neutral labels stored in the DB."""
+    if compound >= 0.05:
+        return "Positive"
+    elif compound <= -0.05:
+        return "Negative"
+    return "Neutral"
+
 class NewsAnalyzer:
     # Remove db_instance, add content_manager if needed for context?
     # Let's assume ContentManager is needed for enrich/analysis context.
@@ -111,10 +166,10 @@ class NewsAnalyzer:
         # --- Removed old ContentManager Init check, rely on type hint & shared instance creation ---
         self.content_manager = content_manager 
         self.llm_client = None # Assuming it uses an LLM client
+        self.groq_client = None # Set once the Groq client is created below
         self.vader_analyzer = None # Initialize VADER analyzer attribute
+        self._analysis_cache = OrderedDict() # _analysis_cache_key(text) -> analysis dict, LRU order
         self.initialized = False
-        # self.analysis_batch_size = 10 # Example batch size - Use Config?
-        # self.processing_timeout = 300 # Example timeout in seconds - Use Config?
 
         # --- Load config for LLM client and other params ---
         try:
@@ -126,6 +181,10 @@ class NewsAnalyzer:
             self.llm_analyze_temp = float(getattr(self.config, 'llm_analyze_temp', DEFAULT_LLM_ANALYZE_TEMP))
             self.llm_analyze_max_tokens = int(getattr(self.config, 'llm_analyze_max_tokens', DEFAULT_LLM_ANALYZE_MAX_TOKENS))
             self.batch_size = int(getattr(self.config, 'news_analysis_batch_size', DEFAULT_NEWS_ANALYSIS_BATCH_SIZE))
+            self.max_batches_per_cycle = int(getattr(self.config, 'news_analysis_max_batches', DEFAULT_NEWS_ANALYSIS_MAX_BATCHES))
+            self.groq_concurrency = int(getattr(self.config, 'groq_concurrency', DEFAULT_GROQ_CONCURRENCY))
+            self.llm_sub_batch_size = int(getattr(self.config, 'llm_sub_batch_size', DEFAULT_LLM_SUB_BATCH_SIZE))
+            self.llm_prior_threshold = float(getattr(self.config, 'news_llm_prior_threshold', DEFAULT_NEWS_LLM_PRIOR_THRESHOLD))
             self.processing_timeout = int(getattr(self.config, 'news_processing_timeout_seconds', DEFAULT_NEWS_PROCESSING_TIMEOUT_SECONDS))
             self.groq_api_key = getattr(self.config, 'groq_api_key', None)
 
@@ -137,9 +196,16 @@ class NewsAnalyzer:
             self.llm_analyze_temp = DEFAULT_LLM_ANALYZE_TEMP
             self.llm_analyze_max_tokens = DEFAULT_LLM_ANALYZE_MAX_TOKENS
             self.batch_size = DEFAULT_NEWS_ANALYSIS_BATCH_SIZE
+            self.max_batches_per_cycle = DEFAULT_NEWS_ANALYSIS_MAX_BATCHES
+            self.groq_concurrency = DEFAULT_GROQ_CONCURRENCY
+            self.llm_sub_batch_size = DEFAULT_LLM_SUB_BATCH_SIZE
+            self.llm_prior_threshold = DEFAULT_NEWS_LLM_PRIOR_THRESHOLD
             self.processing_timeout = DEFAULT_NEWS_PROCESSING_TIMEOUT_SECONDS
             self.groq_api_key = None # Ensure API key is None
 
+        # Bounds concurrent Groq requests across all analysis tasks
+        self._groq_semaphore = asyncio.Semaphore(max(1, self.groq_concurrency))
+
         # Check dependencies
         if not GROQ_AVAILABLE or not NEWS_REPO_AVAILABLE:
             logger.error("NewsAnalyzer initialization failed due to missing dependencies (Groq or NewsRepository).")
@@ -178,7 +244,8 @@ class NewsAnalyzer:
         try:
             # Use async client
             self.groq_client = AsyncGroq(
-                api_key=self.groq_api_key # Use the attribute set from config
+                api_key=self.groq_api_key, # Use the attribute set from config
+                http_client=self._build_groq_http_client()
             )
             if self.groq_client and self.groq_api_key:
                  logger.info(f"AsyncGroq client initialized within NewsAnalyzer using model {self.groq_model}.")
@@ -191,13 +258,23 @@ class NewsAnalyzer:
             logger.error(f"Error during NewsAnalyzer Groq client initialization: {e}", exc_info=True)
             self.initialized = False # Ensure initialized is false
 
-    # --- Remove old _classify_news_with_llm method ---
-    # async def _classify_news_with_llm(self, text: str) -> Tuple[bool, float]:
-    #     ... (old code) ...
+    def _build_groq_http_client(self):
+        """Connection pool shared by every Groq call, sized to the Groq concurrency limit.
 
-    # --- Remove old _summarize_with_llm method ---
-    # async def _summarize_with_llm(self, text: str) -> Optional[str]:
-    #     ... (old code) ...
+        Returns None (SDK default client) when httpx is unavailable.
+        """
+        if not HTTPX_AVAILABLE:
+            return None
+        pool_size = max(1, self.groq_concurrency)
+        return httpx.AsyncClient(
+            http2=H2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=GROQ_KEEPALIVE_SECONDS,
+            ),
+            timeout=httpx.Timeout(GROQ_REQUEST_TIMEOUT_SECONDS),
+        )
 
     # +++ New Combined Analysis Method +++
     async def _analyze_content_with_llm(self, text: str) -> Optional[Dict[str, Any]]:
@@ -214,43 +291,35 @@ class NewsAnalyzer:
         }
 
         if self.groq_client:
-            prompt = _ANALYSIS_PROMPT_JSON.format(text=text)
+            prompt = _ANALYSIS_PROMPT_PREFIX + text + _ANALYSIS_PROMPT_SUFFIX
             try:
-                chat_completion = await self.groq_client.chat.completions.create(
-                    messages=[{"role": "user", "content": prompt}],
-                    model=self.groq_model,
-                    temperature=self.llm_analyze_temp,
-                    max_tokens=self.llm_analyze_max_tokens,
-                )
+                async with self._groq_semaphore:
+                    chat_completion = await self.groq_client.chat.completions.create(
+                        messages=[{"role": "user", "content": prompt}],
+                        model=self.groq_model,
+                        temperature=self.llm_analyze_temp,
+                        max_tokens=self.llm_analyze_max_tokens,
+                        response_format={"type": "json_object"},
+                    )
                 response_content = chat_completion.choices[0].message.content.strip()
                 
                 try:
-                    json_start = response_content.find('{')
-                    json_end = response_content.rfind('}')
-                    if json_start != -1 and json_end != -1 and json_end > json_start:
-                        json_string = response_content[json_start:json_end+1]
-                        parsed_groq_result = json.loads(json_string)
-                        
+                    parsed_groq_result = _json_loads(response_content)
+                    if isinstance(parsed_groq_result, dict):
                         analysis_output["significance"] = parsed_groq_result.get("significance")
                         analysis_output["sentiment"] = parsed_groq_result.get("sentiment")
                         analysis_output["summary"] = parsed_groq_result.get("summary")
                         
                         if not all(k in parsed_groq_result for k in ["significance", "sentiment", "summary"]):
-                            logger.warning(f"Groq JSON response missing some expected keys for '{text[:50]}...': {json_string}")
+                            logger.warning(f"Groq JSON response missing some expected keys for '{text[:50]}...': {response_content}")
                         # Sentiment still missing after Groq success? Fallback to VADER for sentiment only.
                         if not analysis_output["sentiment"] and self.vader_analyzer:
                             logger.warning(f"Groq analysis for '{text[:50]}...' succeeded but missing sentiment. Falling back to VADER for sentiment.")
-                            vader_scores = self.vader_analyzer.polarity_scores(text)
-                            compound = vader_scores['compound']
-                            if compound >= 0.05:
-                                analysis_output["sentiment"] = "Positive"
-                            elif compound <= -0.05:
-                                analysis_output["sentiment"] = "Negative"
-                            else:
-                                analysis_output["sentiment"] = "Neutral"
+                            vader_scores = await asyncio.to_thread(self.vader_analyzer.polarity_scores, text)
+                            analysis_output["sentiment"] = _sentiment_label(vader_scores['compound'])
                             analysis_output["sentiment_source"] = "vader_fallback_groq_no_sentiment"
                     else:
-                         logger.warning(f"Could not find valid JSON object in Groq response for '{text[:50]}...': {response_content}")
+                         logger.warning(f"Groq response for '{text[:50]}...' is not a JSON object: {response_content}")
                          # Groq JSON structure error, try VADER for sentiment if other fields also likely missing
                          analysis_output["sentiment_source"] = "vader_fallback_groq_json_error"
                 except json.JSONDecodeError as json_err:
@@ -269,14 +338,8 @@ class NewsAnalyzer:
         # Fallback to VADER for sentiment if it's still None and VADER is available
         if analysis_output["sentiment"] is None and self.vader_analyzer:
             logger.info(f"Sentiment from Groq is None for '{text[:50]}...'. Using VADER for sentiment. Source: {analysis_output['sentiment_source']}")
-            vader_scores = self.vader_analyzer.polarity_scores(text)
-            compound = vader_scores['compound']
-            if compound >= 0.05:
-                analysis_output["sentiment"] = "Positive"
-            elif compound <= -0.05:
-                analysis_output["sentiment"] = "Negative"
-            else:
-                analysis_output["sentiment"] = "Neutral"
+            vader_scores = await asyncio.to_thread(self.vader_analyzer.polarity_scores, text)
+            analysis_output["sentiment"] = _sentiment_label(vader_scores['compound'])
             # Update source if it was initially groq but sentiment was missing
             if analysis_output["sentiment_source"] == "groq":
                 analysis_output["sentiment_source"] = "vader_fallback_groq_sentiment_missing"
@@ -289,6 +352,121 @@ class NewsAnalyzer:
         logger.debug(f"Final Analysis for '{text[:50]}...': {analysis_output}")
         return analysis_output
 
+    async def _analyze_batch_with_llm(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyzes several tweets with one Groq request.
+        Returns one analysis per text, in order; None where the response had no usable
+        entry, so the caller can fall back to _analyze_content_with_llm for that tweet.
+        """
+        numbered = "\n".join(f'[{i}] \"\"\"{text}\"\"\"' for i, text in enumerate(texts, start=1))
+        prompt = _BATCH_ANALYSIS_PROMPT_JSON.format(tweets=numbered)
+        async with self._groq_semaphore:
+            chat_completion = await self.groq_client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.groq_model,
+                temperature=self.llm_analyze_temp,
+                max_tokens=self.llm_analyze_max_tokens * len(texts),
+                response_format={"type": "json_object"},
+            )
+        response_content = chat_completion.choices[0].message.content
+        entries = _json_loads(response_content).get("analyses")
+        if not isinstance(entries, list):
+            logger.warning(f"Groq batch response has no 'analyses' list: {response_content[:200]}")
+            return [None] * len(texts)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("id")
+            if isinstance(index, str) and index.strip().isdigit():
+                index = int(index) # JSON mode often returns ids as strings
+            if not isinstance(index, int) or isinstance(index, bool) or not 1 <= index <= len(texts):
+                continue
+            if not entry.get("significance") or not entry.get("sentiment"):
+                continue # Incomplete; the single-tweet path handles its fallbacks
+            results[index - 1] = {
+                "significance": entry.get("significance"),
+                "sentiment": entry.get("sentiment"),
+                "summary": entry.get("summary"),
+                "sentiment_source": "groq"
+            }
+        return results
+
+    async def _analyze_chunk_with_ids(self, chunk: List[Tuple[str, str]]) -> List[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+        """Analyze (original_tweet_id, text) pairs with one Groq request, retrying misses one by one."""
+        if len(chunk) == 1:
+            return [await self._analyze_with_id(*chunk[0])]
+        try:
+            batch_results = await self._analyze_batch_with_llm([text for _, text in chunk])
+        except Exception as e:
+            logger.error(f"Groq batch analysis of {len(chunk)} tweets failed, analyzing them one by one: {e}", exc_info=False)
+            batch_results = [None] * len(chunk)
+
+        missing = [(original_tweet_id, text) for (original_tweet_id, text), result in zip(chunk, batch_results) if result is None]
+        if missing:
+            logger.info(f"Analyzing {len(missing)} of {len(chunk)} tweets individually after the batch request.")
+        retried = iter(await asyncio.gather(*(self._analyze_with_id(*item) for item in missing)))
+        return [
+            (original_tweet_id, result, None) if result is not None else next(retried)
+            for (original_tweet_id, _), result in zip(chunk, batch_results)
+        ]
+
+    def _get_cached_analysis(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of a cached analysis, marking it recently used."""
+        cached = self._analysis_cache.get(key)
+        if cached is None:
+            return None
+        self._analysis_cache.move_to_end(key)
+        return dict(cached)
+
+    def _store_cached_analysis(self, key: str, analysis: Dict[str, Any]):
+        """Cache a Groq analysis; VADER fallbacks are not cached so the tweet gets another LLM try."""
+        if analysis.get("sentiment_source") != "groq" or not analysis.get("significance"):
+            return
+        self._analysis_cache[key] = dict(analysis)
+        self._analysis_cache.move_to_end(key)
+        while len(self._analysis_cache) > ANALYSIS_CACHE_SIZE:
+            self._analysis_cache.popitem(last=False)
+
+    def _prefilter_analysis(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Cheap keyword + VADER check run before queueing a Groq call.
+        Returns a Low-significance analysis for short tweets with no news signal
+        (so they are marked processed without an LLM call), or None to use the LLM.
+        """
+        if len(text) > NEWS_LLM_PRIOR_MIN_LENGTH:
+            return None
+        keyword_score = min(1.0, 0.1 * len(_NEWS_KEYWORD_RE.findall(text)))
+        compound = self.vader_analyzer.polarity_scores(text)['compound'] if self.vader_analyzer else 0.0
+        if keyword_score + 0.5 * abs(compound) >= self.llm_prior_threshold:
+            return None
+        return {
+            "significance": "Low",
+            "sentiment": _sentiment_label(compound),
+            "summary": None,
+            "sentiment_source": "vader_prefilter" if self.vader_analyzer else "keyword_prefilter"
+        }
+
+    async def _analyze_with_id(self, original_tweet_id: str, text: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]:
+        """Run _analyze_content_with_llm and return (original_tweet_id, result, error) for as_completed."""
+        try:
+            return original_tweet_id, await self._analyze_content_with_llm(text), None
+        except Exception as e:
+            return original_tweet_id, None, e
+
+    async def _flush_analysis_updates(self, updates: List[tuple]) -> int:
+        """Write buffered analysis updates in one transaction, clear the buffer and return the analyzed rows stored."""
+        if not updates:
+            return 0
+        rows_by_status = await self.news_repo.update_tweet_analysis_batch(updates)
+        stored = rows_by_status.get("analyzed", 0)
+        expected = sum(1 for _, status, _, _ in updates if status == "analyzed")
+        if stored < expected:
+            logger.error(f"Failed to store analysis in DB for {expected - stored} of {expected} analyzed tweets.")
+        updates.clear()
+        return stored
+
     # Update analyze_tweets to use news_repo
     async def analyze_tweets(self, tweets: List[Dict[str, Any]]) -> int:
         """Analyzes a batch of tweets and updates their status in the database via NewsRepository."""
@@ -297,8 +475,14 @@ class NewsAnalyzer:
             return 0
 
         analyzed_count = 0
-        analysis_tasks = []
-
+        analysis_tasks = {} # LLM task -> original_tweet_ids it analyzes
+        prefiltered_updates = []
+        cached_updates = []
+        llm_items = []
+        queued_keys = {} # cache key -> original_tweet_id sent to the LLM
+        duplicate_ids = {} # original_tweet_id sent to the LLM -> same-text tweets waiting on it
+
+        valid_tweets = []
         for tweet in tweets:
             tweet_db_id = tweet.get('id')
             tweet_text = tweet.get('tweet_text')
@@ -308,100 +492,117 @@ class NewsAnalyzer:
             if not tweet_db_id or not tweet_text or not original_tweet_id:
                  logger.warning(f"Skipping tweet due to missing id, text, or original_id: {tweet}")
                  continue
-                 
-            # Schedule analysis for each tweet using the correct method
-            task = asyncio.create_task(self._analyze_content_with_llm(tweet_text))
-            # Track task, tweet_db_id, and original_tweet_id
-            analysis_tasks.append((task, tweet_db_id, original_tweet_id))
+            valid_tweets.append((tweet_db_id, tweet_text, original_tweet_id))
+
+        # VADER is synchronous CPU work; score the whole batch in a worker thread
+        prefilter_results = await asyncio.to_thread(
+            lambda: [self._prefilter_analysis(text) for _, text, _ in valid_tweets]
+        )
+
+        for (tweet_db_id, tweet_text, original_tweet_id), prefiltered in zip(valid_tweets, prefilter_results):
+            if prefiltered:
+                # No keyword or sentiment signal: store as Low significance without asking Groq
+                prefiltered_updates.append((original_tweet_id, "analyzed", prefiltered, None))
+                continue
+
+            cache_key = _analysis_cache_key(tweet_text)
+            cached = self._get_cached_analysis(cache_key)
+            if cached:
+                cached_updates.append((original_tweet_id, "analyzed", cached, None))
+                continue
+            if cache_key in queued_keys:
+                # Same text already queued in this batch; reuse that tweet's result
+                duplicate_ids.setdefault(queued_keys[cache_key], []).append(original_tweet_id)
+                continue
+            queued_keys[cache_key] = original_tweet_id
+
+            llm_items.append((original_tweet_id, tweet_text))
+
+        # One task per sub-batch of tweets; each result carries its original_tweet_id
+        sub_batch_size = max(1, self.llm_sub_batch_size)
+        for start in range(0, len(llm_items), sub_batch_size):
+            chunk = llm_items[start:start + sub_batch_size]
+            task = asyncio.create_task(self._analyze_chunk_with_ids(chunk))
+            analysis_tasks[task] = [original_tweet_id for original_tweet_id, _ in chunk]
+
+        # (original_tweet_id, status, analysis_data, error_message), flushed to the DB in batches
+        # of ANALYSIS_FLUSH_SIZE while the remaining LLM calls are still in flight
+        pending_updates = prefiltered_updates + cached_updates
+        analyzed_expected = len(pending_updates)
+        cache_keys = {original_tweet_id: cache_key for cache_key, original_tweet_id in queued_keys.items()}
+        failed_updates = 0
+        handled_ids = set()
+
+        def record(original_tweet_id, analysis_result, error):
+            nonlocal analyzed_expected, failed_updates
+            handled_ids.add(original_tweet_id)
+            if error is not None:
+                # Error raised by the analysis task
+                logger.error(f"Error processing result for tweet original_id {original_tweet_id}: {error}", exc_info=error)
+                pending_updates.append((original_tweet_id, "analysis_failed", None, str(error)))
+                failed_updates += 1
+            elif analysis_result:
+                pending_updates.append((original_tweet_id, "analyzed", analysis_result, None))
+                analyzed_expected += 1
+                if original_tweet_id in cache_keys:
+                    self._store_cached_analysis(cache_keys[original_tweet_id], analysis_result)
+            else:
+                # LLM Analysis failed internally
+                logger.warning(f"Analysis returned None/empty for tweet original_id: {original_tweet_id}. Marking as analysis_failed.")
+                pending_updates.append((original_tweet_id, "analysis_failed", None, None))
+                failed_updates += 1
+            for duplicate_id in duplicate_ids.get(original_tweet_id, ()):
+                record(duplicate_id, dict(analysis_result) if analysis_result else None, error)
 
-        results = []
         try:
             # Add check for empty tasks before waiting
-            if not analysis_tasks:
+            if not analysis_tasks and not pending_updates:
                 logger.info("No valid tweets found to create analysis tasks for.")
                 return analyzed_count # Return 0 or current count
+            if prefiltered_updates:
+                logger.info(f"Skipped LLM analysis for {len(prefiltered_updates)} tweets with no news signal.")
+            reused = len(cached_updates) + sum(len(ids) for ids in duplicate_ids.values())
+            if reused:
+                logger.info(f"Reused cached or in-batch LLM analysis for {reused} tweets with repeated text.")
 
-            # Wait for tasks with a timeout
-            done, pending = await asyncio.wait(
-                [t for t, _, _ in analysis_tasks],
-                timeout=self.processing_timeout,
-                return_when=asyncio.ALL_COMPLETED
-            )
-
-            if pending:
-                logger.warning(f"{len(pending)} analysis tasks timed out after {self.processing_timeout}s. Cancelling them.")
-                for task in pending:
+            # Store results as they arrive instead of waiting for the slowest Groq call
+            try:
+                for next_done in asyncio.as_completed(analysis_tasks, timeout=self.processing_timeout):
+                    for result in await next_done:
+                        record(*result)
+                    if len(pending_updates) >= ANALYSIS_FLUSH_SIZE:
+                        analyzed_count += await self._flush_analysis_updates(pending_updates)
+            except asyncio.TimeoutError:
+                timed_out = 0
+                for task, original_tweet_ids in analysis_tasks.items():
+                    if all(original_tweet_id in handled_ids for original_tweet_id in original_tweet_ids):
+                        continue
+                    if task.done() and not task.cancelled():
+                        # Finished just as the timeout fired
+                        for result in task.result():
+                            record(*result)
+                        continue
                     task.cancel()
-
-            failed_updates = 0
-            # Unpack original_tweet_id as well
-            for task, tweet_db_id, original_tweet_id in analysis_tasks:
-                if task in done and not task.cancelled():
-                    try:
-                        analysis_result = task.result()
-                        # Pass original_tweet_id and status to the updated function
-                        if analysis_result and original_tweet_id is not None:
-                            update_successful = await self.news_repo.update_tweet_analysis(
-                                original_tweet_id=original_tweet_id, # Use original_tweet_id
-                                status="analyzed",
-                                analysis_data=analysis_result
-                            )
-                            if update_successful:
-                                analyzed_count += 1
-                                logger.debug(f"Successfully analyzed and updated tweet original_id: {original_tweet_id} (DB ID: {tweet_db_id})")
-                            else:
-                                failed_updates += 1
-                                logger.error(f"Failed to update analysis status in DB for tweet original_id: {original_tweet_id}")
-                        elif not analysis_result:
-                            # LLM Analysis failed internally
-                            logger.warning(f"Analysis returned None/empty for tweet original_id: {original_tweet_id}. Marking as analysis_failed.")
-                            if original_tweet_id is not None:
-                                await self.news_repo.update_tweet_analysis(
-                                    original_tweet_id=original_tweet_id, # Use original_tweet_id
-                                    status="analysis_failed",
-                                    analysis_data=None # Ensure no data is passed
-                                )
-                            failed_updates += 1 
-                        
-                    except Exception as e:
-                        # Error during result processing or DB update
-                        logger.error(f"Error processing result or updating DB for tweet original_id {original_tweet_id}: {e}", exc_info=True)
-                        failed_updates += 1
-                        if original_tweet_id is not None:
-                            await self.news_repo.update_tweet_analysis(
-                                original_tweet_id=original_tweet_id, # Use original_tweet_id
-                                status="analysis_failed", # Mark as failed
-                                analysis_data=None,
-                                error_message=str(e) # Optionally pass error string
-                            )                            
-                elif task.cancelled():
-                    # Task timed out
-                    logger.warning(f"Analysis task for tweet original_id {original_tweet_id} was cancelled (timeout).")
-                    if original_tweet_id is not None:
-                       await self.news_repo.update_tweet_analysis(
-                            original_tweet_id=original_tweet_id, # Use original_tweet_id
-                            status="analysis_timeout", # Mark as timeout
-                            analysis_data=None
-                        )
-                    failed_updates += 1
-                else: 
-                     # Should not happen
-                     logger.error(f"Task for tweet original_id {original_tweet_id} finished in unexpected state.")
-                     if original_tweet_id is not None: # Mark as failed just in case
-                        await self.news_repo.update_tweet_analysis(
-                            original_tweet_id=original_tweet_id,
-                            status="analysis_failed",
-                            analysis_data=None,
-                            error_message="Unexpected task state"
-                        )
-                     failed_updates += 1
+                    waiting_ids = [duplicate_id for original_tweet_id in original_tweet_ids
+                                   for duplicate_id in duplicate_ids.get(original_tweet_id, ())]
+                    for original_tweet_id in original_tweet_ids + waiting_ids:
+                        logger.warning(f"Analysis task for tweet original_id {original_tweet_id} was cancelled (timeout).")
+                        pending_updates.append((original_tweet_id, "analysis_timeout", None, None))
+                        timed_out += 1
+                failed_updates += timed_out
+                logger.warning(f"Analysis of {timed_out} tweets timed out after {self.processing_timeout}s.")
+
+            analyzed_count += await self._flush_analysis_updates(pending_updates)
+            if analyzed_count < analyzed_expected:
+                failed_updates += analyzed_expected - analyzed_count
 
             if failed_updates > 0:
                  logger.warning(f"Completed analysis run with {failed_updates} failures/timeouts.")
 
         except asyncio.CancelledError:
             logger.warning("analyze_tweets task itself was cancelled.")
-            # Cancel running sub-tasks if any? asyncio.wait should handle this.
+            for task in analysis_tasks:
+                task.cancel()
             return analyzed_count # Return count processed so far
         except Exception as e:
             logger.error(f"Unexpected error in analyze_tweets batch processing: {e}", exc_info=True)
@@ -413,26 +614,47 @@ class NewsAnalyzer:
 
     # Update run_cycle to use news_repo
     async def run_cycle(self):
-        """Runs a single cycle of fetching unprocessed tweets, analyzing, and updating them."""
+        """Runs a cycle of fetching unprocessed tweets, analyzing, and updating them.
+
+        Full batches are followed immediately by the next one (up to max_batches_per_cycle),
+        so a backlog drains in one run on the already-warm clients instead of one batch per
+        scheduler tick.
+        """
         if not self.initialized or not self.news_repo:
             logger.error("Cannot run analysis cycle: NewsAnalyzer not initialized or NewsRepository unavailable.")
             return
 
+        processed_count = 0
+        batches_run = 0
         try:
-            logger.info(f"Starting news analysis cycle. Fetching up to {self.batch_size} unprocessed tweets...")
-            # Use news_repo to get tweets
-            unprocessed_tweets = await self.news_repo.get_unprocessed_news_tweets(limit=self.batch_size)
+            while batches_run < self.max_batches_per_cycle:
+                logger.info(f"Starting news analysis batch {batches_run + 1}. Fetching up to {self.batch_size} unprocessed tweets...")
+                # Use news_repo to get tweets
+                unprocessed_tweets = await self.news_repo.get_unprocessed_news_tweets(limit=self.batch_size)
 
-            if not unprocessed_tweets:
-                logger.info("No unprocessed news tweets found to analyze.")
-                return
+                if not unprocessed_tweets:
+                    if batches_run == 0:
+                        logger.info("No unprocessed news tweets found to analyze.")
+                    break
 
-            logger.info(f"Fetched {len(unprocessed_tweets)} tweets for analysis.")
-            
-            # Tweets from repo should already be dicts
-            processed_count = await self.analyze_tweets(unprocessed_tweets)
+                logger.info(f"Fetched {len(unprocessed_tweets)} tweets for analysis.")
+                
+                # Tweets from repo should already be dicts
+                batch_count = await self.analyze_tweets(unprocessed_tweets)
+                processed_count += batch_count
+                batches_run += 1
+
+                # Nothing stored (DB write or Groq failing): the next fetch would return the
+                # same rows and pay for their analysis again, so leave them for the next tick
+                if batch_count == 0:
+                    logger.warning("No tweets were stored as analyzed in this batch. Stopping the cycle early.")
+                    break
+
+                # A short batch means the backlog is drained
+                if len(unprocessed_tweets) < self.batch_size:
+                    break
             
-            logger.info(f"News analysis cycle finished. Processed {processed_count} tweets in this cycle.")
+            logger.info(f"News analysis cycle finished. Processed {processed_count} tweets in {batches_run} batch(es).")
 
         except Exception as e:
             logger.error(f"Error during news analysis cycle execution: {e}", exc_info=True)
@@ -447,9 +669,12 @@ class NewsAnalyzer:
                 logger.info("NewsRepository connection closed within NewsAnalyzer.")
             except Exception as e:
                 logger.error(f"Error closing NewsRepository in NewsAnalyzer: {e}", exc_info=True)
-        # Close LLM client if needed
-        # if self.llm_client and hasattr(self.llm_client, 'close'):
-        #     await self.llm_client.close()
+        # Close the Groq client's connection pool
+        if self.groq_client:
+            try:
+                await self.groq_client.close()
+            except Exception as e:
+                logger.error(f"Error closing Groq client in NewsAnalyzer: {e}", exc_info=True)
         self.initialized = False
         logger.info("NewsAnalyzer closed.")
 
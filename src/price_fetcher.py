@@ -2,11 +2,36 @@ import aiohttp
 from datetime import datetime
 from typing import Dict, Optional
 import asyncio
+import time
+
+# Wait used when a 429 response has no usable Retry-After header, and the longest
+# Retry-After we are willing to sleep for inside a scheduled post.
+DEFAULT_RETRY_AFTER_SECONDS = 60.0
+MAX_RETRY_AFTER_SECONDS = 120.0
+
+class RateLimitedError(Exception):
+    """CoinGecko answered 429; retry_after is how long it asked us to wait (seconds)."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited by CoinGecko, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+def _parse_retry_after(value: Optional[str]) -> float:
+    """Seconds to wait from a Retry-After header (delta-seconds form only)."""
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER_SECONDS)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
 
 class PriceFetcher:
     def __init__(self):
         self.base_url = "https://api.coingecko.com/api/v3"
         self.session: Optional[aiohttp.ClientSession] = None
+        # Last good response and its ETag, for conditional (If-None-Match) requests
+        self._etag: Optional[str] = None
+        self._last_price: Optional[Dict[str, float]] = None
+        # time.monotonic() before which CoinGecko asked us not to call again (after a 429)
+        self._retry_not_before = 0.0
 
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -21,14 +46,34 @@ class PriceFetcher:
         if not self.session:
             self.session = aiohttp.ClientSession()
         
+        headers = {}
+        if self._etag and self._last_price:
+            headers["If-None-Match"] = self._etag
+        
+        # Honour an earlier Retry-After instead of spending another request on a 429
+        wait = self._retry_not_before - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        
         try:
-            async with self.session.get(f"{self.base_url}/simple/price?ids=bitcoin&vs_currencies=usd") as response:
+            async with self.session.get(f"{self.base_url}/simple/price?ids=bitcoin&vs_currencies=usd", headers=headers) as response:
+                if response.status == 429:
+                    retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+                    self._retry_not_before = time.monotonic() + retry_after
+                    raise RateLimitedError(retry_after)
+                if response.status == 304 and self._last_price:
+                    # Unchanged since the last fetch; skip decoding a body
+                    return dict(self._last_price)
                 if response.status == 200:
                     data = await response.json()
+                    self._last_price = data["bitcoin"]
+                    self._etag = response.headers.get("ETag")
                     return data["bitcoin"]
                 else:
                     print(f"Error fetching price: HTTP {response.status}")
                     return {"usd": 0.0}
+        except RateLimitedError:
+            raise
         except Exception as e:
             print(f"Error fetching price: {e}")
             return {"usd": 0.0}
@@ -44,6 +89,11 @@ class PriceFetcher:
         for attempt in range(max_retries):
             try:
                 return await self.get_btc_price()
+            except RateLimitedError as e:
+                if attempt == max_retries - 1:
+                    raise e
+                print(f"CoinGecko rate limit hit, waiting {e.retry_after:.0f}s before retrying")
+                # get_btc_price() waits out the Retry-After window before the next request
             except Exception as e:
                 if attempt == max_retries - 1:
                     raise e
@@ -10,6 +10,8 @@ import datetime
 import json
 import logging
 import os
+import threading
+import time
 from typing import Dict, Any, List, Optional, Tuple
 
 # Configure logging
@@ -19,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger('prompt_templates')
 
+# How long list_templates() results are reused before re-querying the DB
+TEMPLATE_LIST_CACHE_TTL_SECONDS = 60
+
 # Try to import database utilities, fallback to mock if not available
 try:
     from database import get_db_connection
@@ -45,6 +50,9 @@ class PromptManager:
             db_path: Path to SQLite database (optional)
         """
         self.db_path = db_path
+        # purpose -> (expires_at, templates); cleared on any template write
+        self._list_cache: Dict[Optional[str], Tuple[float, List[Dict[str, Any]]]] = {}
+        self._list_cache_lock = threading.Lock()
         self._ensure_table_exists()
         
     def _ensure_table_exists(self) -> None:
@@ -114,6 +122,11 @@ class PromptManager:
             conn.close()
         except Exception as e:
             logger.error(f"Error ensuring tables exist: {str(e)}")
+
+    def _invalidate_list_cache(self) -> None:
+        """Drop cached list_templates() results after a template changes"""
+        with self._list_cache_lock:
+            self._list_cache.clear()
             
     def get_template(self, template_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -261,6 +274,7 @@ class PromptManager:
             template_id = cursor.lastrowid
             conn.commit()
             conn.close()
+            self._invalidate_list_cache()
             
             logger.info(f"Created template '{name}' with ID {template_id}")
             return template_id
@@ -308,6 +322,7 @@ class PromptManager:
                 
             conn.commit()
             conn.close()
+            self._invalidate_list_cache()
             
             logger.info(f"Updated template {template_id}")
             return True
@@ -338,6 +353,7 @@ class PromptManager:
                 
             conn.commit()
             conn.close()
+            self._invalidate_list_cache()
             
             logger.info(f"Deleted template {template_id}")
             return True
@@ -348,6 +364,8 @@ class PromptManager:
     def list_templates(self, purpose: str = None) -> List[Dict[str, Any]]:
         """
         List all templates, optionally filtered by purpose.
+        Results are cached for TEMPLATE_LIST_CACHE_TTL_SECONDS and invalidated
+        whenever a template is created, updated, used, scored or deleted.
         
         Args:
             purpose: Optional purpose to filter by
@@ -355,6 +373,11 @@ class PromptManager:
         Returns:
             List of template dictionaries
         """
+        with self._list_cache_lock:
+            cached = self._list_cache.get(purpose)
+        if cached and time.monotonic() < cached[0]:
+            return [dict(t) for t in cached[1]]
+
         try:
             conn = get_db_connection(self.db_path)
             cursor = conn.cursor()
@@ -385,8 +408,14 @@ class PromptManager:
                     "last_used": row[5],
                     "performance_score": row[6]
                 })
+
+            with self._list_cache_lock:
+                self._list_cache[purpose] = (
+                    time.monotonic() + TEMPLATE_LIST_CACHE_TTL_SECONDS,
+                    templates
+                )
                 
-            return templates
+            return [dict(t) for t in templates]
         except Exception as e:
             logger.error(f"Error listing templates: {str(e)}")
             return []
@@ -444,6 +473,7 @@ class PromptManager:
             
             conn.commit()
             conn.close()
+            self._invalidate_list_cache()
         except Exception as e:
             logger.error(f"Error updating template usage {template_id}: {str(e)}")
     
@@ -470,6 +500,7 @@ class PromptManager:
             
             # Update in database
             self.update_template(template_id, performance_score=new_score)
+            self._invalidate_list_cache()
             
             logger.info(f"Updated performance score for template {template_id}: {new_score:.3f}")
         except Exception as e:
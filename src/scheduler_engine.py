@@ -324,6 +324,10 @@ async def stop():
     logger.info("Shutting down scheduler engine...")
     try:
         scheduler_instance.shutdown()
+        # Release the CoinGecko session shared by post_btc_update runs
+        main_module = sys.modules.get('src.main')
+        if main_module and hasattr(main_module, 'close_price_fetcher'):
+            await main_module.close_price_fetcher()
         # await log_status_to_db("Stopped", "Scheduler engine shut down.") # Use await
         await log_status_to_db("Stopped", "Scheduler engine shut down.") 
         logger.info("Scheduler engine shut down successfully.")
@@ -11,6 +11,7 @@ import os
 import sys
 import random
 import datetime
+import threading
 from typing import Dict, Any, Optional
 
 # Add the root directory to path to help with imports
@@ -186,13 +187,39 @@ class LLMTweetGenerator:
             }
             
         except Exception as e:
-            logger.error(f"Error fetching latest price: {str(e)}")
+            logger.error("Error fetching latest price: %s", e)
             return {
                 'price': 0,
                 'change_pct': 0,
                 'success': False
             }
     
+    def _generate_price_update(self, price_data: Dict[str, Any], market_trend: str) -> Dict[str, Any]:
+        """Generate a price update tweet"""
+        return self.content_generator.generate_price_update(
+            current_price=price_data['price'],
+            change_24h=price_data['change_pct'],
+            market_trend=market_trend
+        )
+
+    def _generate_joke(self, price_data: Dict[str, Any], market_trend: str) -> Dict[str, Any]:
+        """Generate a crypto joke tweet"""
+        return self.content_generator.generate_crypto_joke()
+
+    def _generate_motivation(self, price_data: Dict[str, Any], market_trend: str) -> Dict[str, Any]:
+        """Generate a motivational tweet"""
+        return self.content_generator.generate_motivational_content(
+            current_price=price_data['price'],
+            market_status=market_trend
+        )
+
+    # LLM content type -> (generator, traditional content type stored in posts)
+    _CONTENT_HANDLERS = {
+        'price_update': (_generate_price_update, 'price'),
+        'joke': (_generate_joke, 'joke'),
+        'motivation': (_generate_motivation, 'quote'),
+    }
+
     def generate_tweet_content(self) -> Dict[str, Any]:
         """
         Generate tweet content using the LLM.
@@ -210,7 +237,7 @@ class LLMTweetGenerator:
         try:
             # Determine content type
             content_type = self.determine_content_type()
-            logger.info(f"Generating content of type: {content_type}")
+            logger.info("Generating content of type: %s", content_type)
             
             # Get price data
             price_data = self.fetch_latest_price()
@@ -226,37 +253,19 @@ class LLMTweetGenerator:
             market_trend = self.get_market_trend(price_data['change_pct'])
             
             # Generate content based on type
-            result = None
-            
-            if content_type == 'price_update':
-                result = self.content_generator.generate_price_update(
-                    current_price=price_data['price'],
-                    change_24h=price_data['change_pct'],
-                    market_trend=market_trend
-                )
-                traditional_type = 'price'
-                
-            elif content_type == 'joke':
-                result = self.content_generator.generate_crypto_joke()
-                traditional_type = 'joke'
-                
-            elif content_type == 'motivation':
-                result = self.content_generator.generate_motivational_content(
-                    current_price=price_data['price'],
-                    market_status=market_trend
-                )
-                traditional_type = 'quote'
-                
-            else:
-                logger.error(f"Unknown content type: {content_type}")
+            handler = self._CONTENT_HANDLERS.get(content_type)
+            if handler is None:
+                logger.error("Unknown content type: %s", content_type)
                 return {
                     'success': False,
                     'error': f'Unknown content type: {content_type}'
                 }
+            generate, traditional_type = handler
+            result = generate(self, price_data, market_trend)
                 
             if not result or not result.get('success', False):
                 error = result.get('error', 'Unknown error') if result else 'Generation failed'
-                logger.error(f"Content generation failed: {error}")
+                logger.error("Content generation failed: %s", error)
                 return {
                     'success': False,
                     'error': error
@@ -266,7 +275,7 @@ class LLMTweetGenerator:
             is_valid, reason = self.content_generator.validate_content(result['text'])
             
             if not is_valid:
-                logger.warning(f"Generated content validation failed: {reason}")
+                logger.warning("Generated content validation failed: %s", reason)
                 return {
                     'success': False,
                     'error': f'Content validation failed: {reason}'
@@ -284,7 +293,7 @@ class LLMTweetGenerator:
             }
             
         except Exception as e:
-            logger.error(f"Error generating tweet content: {str(e)}")
+            logger.error("Error generating tweet content: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -327,7 +336,7 @@ class LLMTweetGenerator:
             )
             
             if not tweet_result.get('success', False):
-                logger.error(f"Failed to post tweet: {tweet_result.get('error', 'Unknown error')}")
+                logger.error("Failed to post tweet: %s", tweet_result.get('error', 'Unknown error'))
                 return {
                     'success': False,
                     'error': f"Failed to post tweet: {tweet_result.get('error', 'Unknown error')}"
@@ -343,9 +352,9 @@ class LLMTweetGenerator:
                 conn.commit()
                 conn.close()
             except Exception as e:
-                logger.warning(f"Failed to update post with LLM metadata: {str(e)}")
+                logger.warning("Failed to update post with LLM metadata: %s", e)
                 
-            logger.info(f"Successfully posted LLM-generated tweet (ID: {tweet_result['post_id']})")
+            logger.info("Successfully posted LLM-generated tweet (ID: %s)", tweet_result['post_id'])
             
             return {
                 'success': True,
@@ -358,7 +367,7 @@ class LLMTweetGenerator:
             }
             
         except Exception as e:
-            logger.error(f"Error posting tweet: {str(e)}")
+            logger.error("Error posting tweet: %s", e)
             return {
                 'success': False,
                 'error': str(e)
@@ -367,12 +376,16 @@ class LLMTweetGenerator:
 
 # Function to get a singleton instance
 _instance = None
+_instance_lock = threading.Lock()
 
 def get_llm_tweet_generator() -> LLMTweetGenerator:
-    """Get the singleton instance of LLMTweetGenerator"""
+    """Get the singleton instance of LLMTweetGenerator, creating it on first use"""
     global _instance
     if _instance is None:
-        _instance = LLMTweetGenerator()
+        with _instance_lock:
+            # Re-check so concurrent callers don't initialize the LLM client twice
+            if _instance is None:
+                _instance = LLMTweetGenerator()
     return _instance
 
 
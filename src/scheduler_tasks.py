@@ -27,7 +27,7 @@ except ImportError as e:
 
 try:
     # Import post_btc_update from main
-    from src.main import post_btc_update
+    from src.main import post_btc_update, wait_for_background_sends
     POST_BTC_UPDATE_AVAILABLE = True
 except ImportError as e:
     POST_BTC_UPDATE_AVAILABLE = False
@@ -391,9 +391,13 @@ async def update_tweet_engagement_stats_task():
 
 # --- Manual Trigger Functions (for CLI) ---
 
-def trigger_post_tweet():
+async def trigger_post_tweet():
     print("Manually triggering tweet post...")
-    return post_tweet_and_log()
+    result = await post_tweet_and_log()
+    if POST_BTC_UPDATE_AVAILABLE:
+        # Let Discord/Telegram sends finish before the CLI's asyncio.run() tears the loop down
+        await wait_for_background_sends()
+    return result
 
 async def trigger_fetch_news():
     print("Manually triggering news fetch...")
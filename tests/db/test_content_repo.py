@@ -133,4 +133,23 @@ class TestContentRepository:
     async def test_delete_joke_postgres(self, repo_postgres, mock_postgres_connection):
         """Test deleting a joke with PostgreSQL"""
         result = await repo_postgres.delete_joke(1)
-        assert result is True 
\ No newline at end of file
+        assert result is True
+    
+    @pytest.mark.asyncio
+    async def test_add_many_postgres(self, repo_postgres, mock_postgres_connection):
+        """Test bulk-adding quotes with PostgreSQL uses one executemany and one commit"""
+        rows = [("Quote one", "motivational"), ("Quote two", "motivational")]
+        added = await repo_postgres.add_many("quotes", rows)
+        assert added == 2
+        
+        mock_conn = mock_postgres_connection.return_value
+        mock_cursor = mock_conn.cursor.return_value
+        mock_cursor.executemany.assert_called_once()
+        assert mock_cursor.executemany.call_args[0][1] == [("Quote one", "motivational", 0), ("Quote two", "motivational", 0)]
+        mock_conn.commit.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_add_many_rejects_unknown_collection(self, repo_postgres):
+        """Test that only the quotes and jokes tables can be bulk-loaded"""
+        with pytest.raises(ValueError):
+            await repo_postgres.add_many("prices", [("x", "y")])
@@ -9,7 +9,7 @@ from unittest.mock import patch, MagicMock, AsyncMock
 # Add the src directory to the path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
-from src.db.news_repo import NewsRepository
+from src.db.news_repo import NewsRepository, clear_top_news_cache
 
 class TestNewsRepository:
     """Test suite for NewsRepository"""
@@ -147,6 +147,28 @@ class TestNewsRepository:
         # Verify commit was called
         assert mock_postgres_connection.return_value.commit.called
 
+    @pytest.mark.asyncio
+    async def test_update_tweet_analysis_batch_postgres(self, repo_postgres, mock_postgres_connection):
+        """Test that a batch of analysis updates is written with one executemany per statement"""
+        mock_conn = mock_postgres_connection.return_value
+        cursor = mock_conn.cursor.return_value.__enter__.return_value
+        cursor.rowcount = 2
+        analysis = {'sentiment': 'Positive', 'significance': 'High', 'summary': 'Test summary'}
+        
+        result = await repo_postgres.update_tweet_analysis_batch([
+            ('111', 'analyzed', analysis, None),
+            ('222', 'analyzed', analysis, None),
+            ('333', 'analysis_timeout', None, None),
+            ('', 'analyzed', analysis, None),  # Invalid, skipped
+        ])
+        
+        assert result == {'analyzed': 2, 'analysis_timeout': 2}
+        assert cursor.executemany.call_count == 2
+        analyzed_params = cursor.executemany.call_args_list[0][0][1]
+        assert [params[-1] for params in analyzed_params] == ['111', '222']
+        mock_conn.commit.assert_called_once()
+        mock_conn.rollback.assert_not_called()
+
     @pytest.mark.asyncio
     async def test_get_last_fetched_tweet_id_postgres(self, repo_postgres, mock_postgres_connection):
         """Test retrieving the last fetched tweet ID with PostgreSQL"""
@@ -202,6 +224,61 @@ class TestNewsRepository:
             assert "WHERE processed = FALSE" in call_args[0]
             assert "LIMIT" in call_args[0]
 
+    @pytest.mark.asyncio
+    async def test_get_top_significant_news_postgres(self, repo_postgres, mock_postgres_connection):
+        """Test selecting the best recent news item with PostgreSQL"""
+        expected = {
+            'original_tweet_id': '123456789',
+            'summary': 'Test summary',
+            'significance_score': 0.9,
+            'sentiment_label': 'Positive'
+        }
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = expected
+        mock_postgres_connection.return_value.cursor.return_value = mock_cursor
+        
+        clear_top_news_cache()
+        with patch('src.db.news_repo.RealDictCursor'):
+            news_item = await repo_postgres.get_top_significant_news(
+                hours_limit=6, high_threshold=0.8, medium_threshold=0.4
+            )
+            assert news_item == expected
+            
+            # Selection happens in SQL: thresholds are bound and only one row is requested
+            sql, params = mock_cursor.execute.call_args[0]
+            assert "LIMIT 1" in sql
+            assert "vader_fallback" in sql
+            assert params == (6, 0.8, 0.4)
+            
+            # A repeated lookup within the TTL is served from the cache
+            again = await repo_postgres.get_top_significant_news(
+                hours_limit=6, high_threshold=0.8, medium_threshold=0.4
+            )
+            assert again == expected
+            assert mock_cursor.execute.call_count == 1
+            
+            # Analysis updates invalidate the cached selection
+            mock_cursor.rowcount = 1
+            assert await repo_postgres.update_tweet_analysis(
+                original_tweet_id='123456789', status='analyzed',
+                analysis_data={'sentiment': 'Positive', 'significance': 'High', 'summary': 'Test summary'}
+            )
+            await repo_postgres.get_top_significant_news(
+                hours_limit=6, high_threshold=0.8, medium_threshold=0.4
+            )
+            assert mock_cursor.execute.call_count == 3  # select, update, select
+
+    @pytest.mark.asyncio
+    async def test_get_top_significant_news_postgres_none(self, repo_postgres, mock_postgres_connection):
+        """Test that no qualifying news returns None with PostgreSQL"""
+        mock_cursor = MagicMock()
+        mock_cursor.fetchone.return_value = None
+        mock_postgres_connection.return_value.cursor.return_value = mock_cursor
+        
+        clear_top_news_cache()
+        with patch('src.db.news_repo.RealDictCursor'):
+            assert await repo_postgres.get_top_significant_news() is None
+
     @pytest.mark.asyncio
     async def test_update_tweet_analysis_postgres(self, repo_postgres, mock_postgres_connection):
         """Test updating tweet analysis with PostgreSQL"""
@@ -0,0 +1,76 @@
+import pytest
+import pytest_asyncio
+import os
+import sys
+import asyncio
+import aiosqlite
+
+# Add the src directory to the path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from src.db.pool import SqlitePool
+
+class TestSqlitePool:
+    """Test suite for SqlitePool"""
+
+    @pytest_asyncio.fixture
+    async def pool(self, tmp_path):
+        pool = SqlitePool(str(tmp_path / "pool.db"))
+        async with pool.connection() as conn:
+            await conn.execute("CREATE TABLE items (name TEXT NOT NULL)")
+            await conn.commit()
+        yield pool
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_connection_is_shared_between_acquisitions(self, pool):
+        async with pool.connection() as first:
+            pass
+        async with pool.connection() as second:
+            pass
+        assert first is second
+
+    @pytest.mark.asyncio
+    async def test_exception_rolls_back_open_transaction(self, pool):
+        with pytest.raises(RuntimeError):
+            async with pool.connection() as conn:
+                await conn.execute("INSERT INTO items (name) VALUES ('uncommitted')")
+                raise RuntimeError("caller failed mid-transaction")
+
+        async with pool.connection() as conn:
+            async with conn.execute("SELECT COUNT(*) FROM items") as cursor:
+                assert (await cursor.fetchone())[0] == 0
+
+    @pytest.mark.asyncio
+    async def test_row_factory_is_reset_for_next_caller(self, pool):
+        async with pool.connection() as conn:
+            conn.row_factory = aiosqlite.Row
+        async with pool.connection() as conn:
+            assert conn.row_factory is None
+
+    @pytest.mark.asyncio
+    async def test_callers_are_serialized(self, pool):
+        events = []
+
+        async def use(name):
+            async with pool.connection():
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+
+        await asyncio.gather(use("a"), use("b"))
+
+        assert events in (["a start", "a end", "b start", "b end"],
+                          ["b start", "b end", "a start", "a end"])
+
+    @pytest.mark.asyncio
+    async def test_close_is_idempotent_and_next_use_reopens(self, pool):
+        async with pool.connection() as first:
+            pass
+        await pool.close()
+        await pool.close()
+
+        async with pool.connection() as second:
+            async with second.execute("SELECT COUNT(*) FROM items") as cursor:
+                assert (await cursor.fetchone())[0] == 0
+        assert second is not first
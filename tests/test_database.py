@@ -0,0 +1,120 @@
+import pytest
+import os
+import sys
+import sqlite3
+from datetime import datetime, timedelta
+
+# Add the src directory to the path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.database import Database
+
+# Timestamp styles found in posts.timestamp: log_post() writes ISO 'T' with microseconds,
+# older writers used a space separator and/or whole seconds
+TIMESTAMP_FORMATS = {
+    "iso_micro": lambda ts: ts.isoformat(),
+    "iso_seconds": lambda ts: ts.isoformat(timespec='seconds'),
+    "space_micro": lambda ts: ts.isoformat(sep=' '),
+    "space_seconds": lambda ts: ts.isoformat(sep=' ', timespec='seconds'),
+}
+
+def insert_post(db_path, timestamp):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO posts (tweet_id, tweet, timestamp, price, price_change, content_type) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ("1", "tweet", timestamp, 50000.0, 0.0, "quote")
+        )
+
+def insert_price(db_path, price, timestamp):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO prices (price, timestamp, source) VALUES (?, ?, ?)",
+            (price, timestamp, "coingecko")
+        )
+
+def count_rows(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+class TestDatabaseSqlite:
+    """Database queries run against a temporary SQLite file"""
+
+    @pytest.fixture
+    def db_path(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('DATABASE_URL', raising=False)
+        return str(tmp_path / "btcbuzzbot.db")
+
+    @pytest.fixture
+    def db(self, db_path):
+        return Database(db_path)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("style", sorted(TIMESTAMP_FORMATS))
+    @pytest.mark.parametrize("age, expected", [
+        (timedelta(minutes=4, seconds=30), True),   # just inside a 5 minute window
+        (timedelta(minutes=5, seconds=30), False),  # just outside
+        (timedelta(days=1), False),                 # earlier day
+    ])
+    async def test_has_posted_recently_matches_datetime_comparison(self, db, db_path, style, age, expected):
+        """The indexable range condition agrees with the original datetime() comparison"""
+        insert_post(db_path, TIMESTAMP_FORMATS[style](datetime.utcnow() - age))
+
+        with sqlite3.connect(db_path) as conn:
+            baseline = conn.execute(
+                "SELECT 1 FROM posts WHERE datetime(timestamp) > datetime('now', ? || ' minutes') LIMIT 1",
+                (-5,)
+            ).fetchone() is not None
+
+        assert baseline is expected
+        assert await db.has_posted_recently(minutes=5) is expected
+        assert (await db.get_latest_price_and_recent_post(minutes=5))[1] is expected
+
+    @pytest.mark.asyncio
+    async def test_get_latest_price_and_recent_post_without_prices(self, db):
+        assert await db.get_latest_price_and_recent_post(minutes=5) == (None, False)
+
+    @pytest.mark.asyncio
+    async def test_get_latest_price_and_recent_post_without_recent_post(self, db, db_path):
+        now = datetime.utcnow()
+        insert_price(db_path, 49000.0, (now - timedelta(hours=1)).isoformat())
+        insert_price(db_path, 50000.0, now.isoformat())
+        insert_post(db_path, (now - timedelta(hours=1)).isoformat())
+
+        latest_price, posted_recently = await db.get_latest_price_and_recent_post(minutes=5)
+
+        assert latest_price["price"] == 50000.0
+        assert latest_price["source"] == "coingecko"
+        assert posted_recently is False
+
+    @pytest.mark.asyncio
+    async def test_get_latest_price_and_recent_post_with_recent_post(self, db, db_path):
+        now = datetime.utcnow()
+        insert_price(db_path, 50000.0, now.isoformat())
+        insert_post(db_path, (now - timedelta(minutes=1)).isoformat())
+
+        latest_price, posted_recently = await db.get_latest_price_and_recent_post(minutes=5)
+
+        assert latest_price["price"] == 50000.0
+        assert posted_recently is True
+
+    @pytest.mark.asyncio
+    async def test_log_post_with_price_writes_price_and_post(self, db, db_path):
+        post_id = await db.log_post_with_price("123", "BTC tweet", 50000.0, 2.5, "quote")
+
+        assert post_id > 0
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT price, source FROM prices").fetchall() == [(50000.0, "coingecko")]
+            assert conn.execute("SELECT id, tweet_id, price, price_change FROM posts").fetchall() == [(post_id, "123", 50000.0, 2.5)]
+
+    @pytest.mark.asyncio
+    async def test_log_post_with_price_rolls_back_price_when_post_insert_fails(self, db, db_path):
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "CREATE TRIGGER reject_posts BEFORE INSERT ON posts "
+                "BEGIN SELECT RAISE(ABORT, 'posts insert rejected'); END"
+            )
+
+        assert await db.log_post_with_price("123", "BTC tweet", 50000.0, 2.5, "quote") == -1
+        assert count_rows(db_path, "prices") == 0
+        assert count_rows(db_path, "posts") == 0
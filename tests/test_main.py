@@ -2,18 +2,26 @@ import pytest
 import os
 import sys
 import asyncio
-import json
+import time
 from datetime import datetime
 from unittest.mock import patch, MagicMock, AsyncMock, call
 
 # Add the src directory to the path so we can import modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
 
-from src.main import post_btc_update, post_direct_tweet
+from src.main import post_btc_update, post_direct_tweet, get_config, wait_for_background_sends, get_btc_price_cached, get_twitter_client
 
 class TestMain:
     """Test suite for the main module"""
     
+    @pytest.fixture(autouse=True)
+    def reset_last_post_time(self):
+        """Forget posts, prices and clients left by earlier tests"""
+        with patch('src.main._last_post_monotonic', None), \
+             patch('src.main._price_cache', None):
+            get_twitter_client.cache_clear()
+            yield
+    
     @pytest.fixture
     def mock_price_data(self):
         """Mock price data for tests"""
@@ -46,12 +54,17 @@ class TestMain:
         config = MagicMock()
         config.sqlite_db_path = "test.db"
         config.coingecko_retry_limit = 3
+        config.price_cache_ttl_seconds = 45
+        config.duplicate_post_check_minutes = 5
         config.twitter_api_key = "test_key"
         config.twitter_api_secret = "test_secret"
         config.twitter_access_token = "test_token"
         config.twitter_access_token_secret = "test_token_secret"
         config.enable_discord_posting = True
         config.discord_webhook_url = "https://discord.webhook/test"
+        config.enable_telegram_posting = False
+        config.telegram_bot_token = "test_bot_token"
+        config.telegram_chat_id = "test_chat_id"
         return config
     
     # ------ Test post_btc_update function ------
@@ -65,19 +78,20 @@ class TestMain:
              patch('src.main.ContentManager') as mock_content_manager_class, \
              patch('src.main.PriceFetcher') as mock_price_fetcher_class, \
              patch('src.main.TwitterClient') as mock_twitter_class, \
-             patch('src.main.send_discord_message') as mock_discord, \
+             patch('src.main.send_discord_message', new_callable=AsyncMock) as mock_discord, \
+             patch('src.main.send_telegram_message', new_callable=AsyncMock) as mock_telegram, \
              patch('src.main.Config', return_value=mock_config):
             
             # Configure mocks
+            mock_config.enable_telegram_posting = True
             mock_db = AsyncMock()
-            mock_db.get_latest_price.return_value = mock_latest_price_data
+            mock_db.get_latest_price_and_recent_post.return_value = (mock_latest_price_data, False)
             mock_db.store_price.return_value = True
-            mock_db.has_posted_recently.return_value = False
-            mock_db.log_post.return_value = True
+            mock_db.log_post_with_price.return_value = 1
             mock_db_class.return_value = mock_db
             
             mock_news_repo = AsyncMock()
-            mock_news_repo.get_recent_analyzed_news.return_value = []
+            mock_news_repo.get_top_significant_news.return_value = None
             mock_news_repo_class.return_value = mock_news_repo
             
             mock_content_manager = AsyncMock()
@@ -88,7 +102,7 @@ class TestMain:
             mock_price_fetcher.__aenter__.return_value = mock_price_fetcher
             mock_price_fetcher.__aexit__.return_value = None
             mock_price_fetcher.get_btc_price_with_retry.return_value = mock_price_data
-            mock_price_fetcher.calculate_price_change.return_value = 2.04  # Calculated price change
+            mock_price_fetcher.calculate_price_change = MagicMock(return_value=2.04)  # Calculated price change
             mock_price_fetcher_class.return_value = mock_price_fetcher
             
             mock_twitter = AsyncMock()
@@ -106,10 +120,11 @@ class TestMain:
             assert mock_price_fetcher.get_btc_price_with_retry.called
             
             # Verify database operations
-            mock_db.get_latest_price.assert_called_once()
-            mock_db.store_price.assert_called_once_with(mock_price_data["usd"])
-            mock_db.has_posted_recently.assert_called_once()
-            mock_db.log_post.assert_called_once()
+            mock_db.get_latest_price_and_recent_post.assert_called_once()
+            # Price is written together with the post log, not separately
+            mock_db.store_price.assert_not_called()
+            assert mock_db.log_post_with_price.call_args.kwargs["price"] == mock_price_data["usd"]
+            mock_db.log_post_with_price.assert_called_once()
             
             # Verify content fetching - should use random content since no news
             mock_content_manager.get_random_content.assert_called_once()
@@ -121,26 +136,29 @@ class TestMain:
             assert mock_content["text"] in tweet_text  # Quote text
             assert "📈" in tweet_text  # Up emoji for positive change
             
-            # Verify Discord posting
-            assert mock_discord.called
-            discord_args = mock_discord.call_args[0]
-            assert mock_config.discord_webhook_url == discord_args[0]
-            assert "$50,000.00" in discord_args[1]  # Same content sent to Discord
+            # Verify Discord/Telegram posting (sent in the background after the tweet)
+            await wait_for_background_sends()
+            mock_discord.assert_awaited_once_with(mock_config.discord_webhook_url, tweet_text)
+            mock_telegram.assert_awaited_once_with(
+                mock_config.telegram_bot_token,
+                mock_config.telegram_chat_id,
+                tweet_text
+            )
     
     @pytest.mark.asyncio
     async def test_post_btc_update_with_news(self, mock_config, mock_price_data, mock_latest_price_data):
         """Test posting a tweet with significant news summary"""
         
-        # Create mock news data with high significance
-        mock_news = [{
+        # Create mock news data with high significance (as selected by the repository)
+        mock_news = {
             'original_tweet_id': '123456789',
-            'llm_raw_analysis': json.dumps({
-                'significance_score': 8,  # High significance
-                'sentiment_score': 7,
-                'summary': 'Bitcoin adoption surges as major retailer announces integration.',
-                'keywords': ['bitcoin', 'adoption', 'retail']
-            })
-        }]
+            'summary': 'Bitcoin adoption surges as major retailer announces integration.',
+            'significance_label': 'High',
+            'significance_score': 0.9,
+            'sentiment_label': 'Positive',
+            'sentiment_score': 0.7,
+            'sentiment_source': 'groq'
+        }
         
         # Mock all dependencies
         with patch('src.main.Database') as mock_db_class, \
@@ -148,19 +166,18 @@ class TestMain:
              patch('src.main.ContentManager') as mock_content_manager_class, \
              patch('src.main.PriceFetcher') as mock_price_fetcher_class, \
              patch('src.main.TwitterClient') as mock_twitter_class, \
-             patch('src.main.send_discord_message') as mock_discord, \
+             patch('src.main.send_discord_message', new_callable=AsyncMock) as mock_discord, \
              patch('src.main.Config', return_value=mock_config):
             
             # Configure mocks
             mock_db = AsyncMock()
-            mock_db.get_latest_price.return_value = mock_latest_price_data
+            mock_db.get_latest_price_and_recent_post.return_value = (mock_latest_price_data, False)
             mock_db.store_price.return_value = True
-            mock_db.has_posted_recently.return_value = False
-            mock_db.log_post.return_value = True
+            mock_db.log_post_with_price.return_value = 1
             mock_db_class.return_value = mock_db
             
             mock_news_repo = AsyncMock()
-            mock_news_repo.get_recent_analyzed_news.return_value = mock_news
+            mock_news_repo.get_top_significant_news.return_value = mock_news
             mock_news_repo_class.return_value = mock_news_repo
             
             # Content manager should not be used due to significant news
@@ -171,7 +188,7 @@ class TestMain:
             mock_price_fetcher.__aenter__.return_value = mock_price_fetcher
             mock_price_fetcher.__aexit__.return_value = None
             mock_price_fetcher.get_btc_price_with_retry.return_value = mock_price_data
-            mock_price_fetcher.calculate_price_change.return_value = 2.04
+            mock_price_fetcher.calculate_price_change = MagicMock(return_value=2.04)
             mock_price_fetcher_class.return_value = mock_price_fetcher
             
             mock_twitter = AsyncMock()
@@ -189,14 +206,18 @@ class TestMain:
             mock_content_manager.get_random_content.assert_not_called()
             
             # Verify news repository was queried
-            mock_news_repo.get_recent_analyzed_news.assert_called_once()
+            mock_news_repo.get_top_significant_news.assert_called_once()
             
             # Verify tweet posting - content should include news summary
             call_args = mock_twitter.post_tweet.call_args[0]
             tweet_text = call_args[0]
             assert "$50,000.00" in tweet_text  # Formatted price
             assert "Bitcoin adoption surges" in tweet_text  # News summary
-            assert "#Bitcoin #News" in tweet_text  # News hashtags
+            assert "#CryptoNews" in tweet_text  # High/Positive news hashtag
+            
+            # Price is written together with the post log, not separately
+            mock_db.log_post_with_price.assert_called_once()
+            mock_db.store_price.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_post_btc_update_negative_price_change(self, mock_config, mock_price_data, mock_latest_price_data, mock_content):
@@ -211,19 +232,18 @@ class TestMain:
              patch('src.main.ContentManager') as mock_content_manager_class, \
              patch('src.main.PriceFetcher') as mock_price_fetcher_class, \
              patch('src.main.TwitterClient') as mock_twitter_class, \
-             patch('src.main.send_discord_message') as mock_discord, \
+             patch('src.main.send_discord_message', new_callable=AsyncMock) as mock_discord, \
              patch('src.main.Config', return_value=mock_config):
             
             # Configure mocks
             mock_db = AsyncMock()
-            mock_db.get_latest_price.return_value = mock_latest_price_data
+            mock_db.get_latest_price_and_recent_post.return_value = (mock_latest_price_data, False)
             mock_db.store_price.return_value = True
-            mock_db.has_posted_recently.return_value = False
-            mock_db.log_post.return_value = True
+            mock_db.log_post_with_price.return_value = 1
             mock_db_class.return_value = mock_db
             
             mock_news_repo = AsyncMock()
-            mock_news_repo.get_recent_analyzed_news.return_value = []
+            mock_news_repo.get_top_significant_news.return_value = None
             mock_news_repo_class.return_value = mock_news_repo
             
             mock_content_manager = AsyncMock()
@@ -234,7 +254,7 @@ class TestMain:
             mock_price_fetcher.__aenter__.return_value = mock_price_fetcher
             mock_price_fetcher.__aexit__.return_value = None
             mock_price_fetcher.get_btc_price_with_retry.return_value = mock_price_data
-            mock_price_fetcher.calculate_price_change.return_value = -2.04  # Negative price change
+            mock_price_fetcher.calculate_price_change = MagicMock(return_value=-2.04)  # Negative price change
             mock_price_fetcher_class.return_value = mock_price_fetcher
             
             mock_twitter = AsyncMock()
@@ -254,6 +274,11 @@ class TestMain:
             assert "$48,000.00" in tweet_text  # Formatted price
             assert "-2.04%" in tweet_text  # Negative percentage
             assert "📉" in tweet_text  # Down emoji for negative change
+            
+            # Price is written together with the post log, not separately
+            mock_db.log_post_with_price.assert_called_once()
+            assert mock_db.log_post_with_price.call_args.kwargs["price_change"] == -2.04
+            mock_db.store_price.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_post_btc_update_recent_post_skip(self, mock_config, mock_price_data):
@@ -267,30 +292,53 @@ class TestMain:
              patch('src.main.TwitterClient') as mock_twitter_class, \
              patch('src.main.Config', return_value=mock_config):
             
-            # Configure mocks - set has_posted_recently to True
+            # Configure mocks - report a recent post
             mock_db = AsyncMock()
-            mock_db.has_posted_recently.return_value = True  # Recent post exists
+            mock_db.get_latest_price_and_recent_post.return_value = (None, True)  # Recent post exists
             mock_db_class.return_value = mock_db
             
             # These should be created but not used much
             mock_news_repo_class.return_value = AsyncMock()
             mock_content_manager_class.return_value = AsyncMock()
-            mock_price_fetcher_class.return_value = AsyncMock()
+            mock_price_fetcher = AsyncMock()
+            mock_price_fetcher.__aenter__.return_value = mock_price_fetcher
+            mock_price_fetcher.get_btc_price_with_retry.return_value = mock_price_data
+            mock_price_fetcher_class.return_value = mock_price_fetcher
             mock_twitter_class.return_value = AsyncMock()
             
+            mock_config.duplicate_post_check_minutes = 15
+            
             # Call the function
             result = await post_btc_update(config=mock_config, scheduled_time_str="20:00")
             
             # Should return None since posting was skipped
             assert result is None
             
-            # Verify database check
-            mock_db.has_posted_recently.assert_called_once()
+            # Verify database check uses the configured window
+            mock_db.get_latest_price_and_recent_post.assert_called_once_with(minutes=15)
             
             # Twitter client post_tweet should not be called
             twitter_instance = mock_twitter_class.return_value
             twitter_instance.post_tweet.assert_not_called()
     
+    @pytest.mark.asyncio
+    async def test_post_btc_update_recent_post_in_process_skips_io(self, mock_config):
+        """A post from this process inside the window skips before any price fetch or DB work"""
+        
+        with patch('src.main.Database') as mock_db_class, \
+             patch('src.main.NewsRepository') as mock_news_repo_class, \
+             patch('src.main.PriceFetcher') as mock_price_fetcher_class, \
+             patch('src.main.TwitterClient') as mock_twitter_class, \
+             patch('src.main._last_post_monotonic', time.monotonic()):
+            
+            result = await post_btc_update(config=mock_config, scheduled_time_str="20:00")
+            
+            assert result is None
+            mock_db_class.assert_not_called()
+            mock_news_repo_class.assert_not_called()
+            mock_price_fetcher_class.assert_not_called()
+            mock_twitter_class.assert_not_called()
+    
     @pytest.mark.asyncio
     async def test_post_direct_tweet(self, mock_price_data):
         """Test direct tweet posting (fallback functionality)"""
@@ -307,6 +355,7 @@ class TestMain:
             mock_config.twitter_access_token = "test_token"
             mock_config.twitter_access_token_secret = "test_token_secret"
             mock_config.coingecko_retry_limit = 3
+            mock_config.price_cache_ttl_seconds = 45
             mock_config_class.return_value = mock_config
             
             mock_twitter = AsyncMock()
@@ -320,7 +369,8 @@ class TestMain:
             mock_price_fetcher.get_btc_price_with_retry.return_value = mock_price_data
             mock_price_fetcher_class.return_value = mock_price_fetcher
             
-            # Call the function
+            # Call the function (drop any Config cached by earlier tests)
+            get_config.cache_clear()
             result = await post_direct_tweet()
             
             # Assertions
@@ -333,4 +383,36 @@ class TestMain:
             call_args = mock_twitter.post_tweet.call_args[0]
             tweet_text = call_args[0]
             assert "$50,000.00" in tweet_text  # Formatted price
-            assert "HODL to the moon" in tweet_text  # Hardcoded fallback quote 
\ No newline at end of file
+            assert "HODL to the moon" in tweet_text  # Hardcoded fallback quote
+    
+    @pytest.mark.asyncio
+    async def test_get_btc_price_cached_reuses_price_within_ttl(self, mock_config, mock_price_data):
+        """Repeated fetches inside one TTL bucket hit CoinGecko only once"""
+        mock_price_fetcher = AsyncMock()
+        mock_price_fetcher.get_btc_price_with_retry.return_value = mock_price_data
+        
+        with patch('src.main.time.time', return_value=1000.0):
+            first = await get_btc_price_cached(mock_price_fetcher, mock_config)
+            second = await get_btc_price_cached(mock_price_fetcher, mock_config)
+        
+        assert first == second == mock_price_data
+        mock_price_fetcher.get_btc_price_with_retry.assert_called_once_with(3)
+        
+        # A new bucket fetches again
+        with patch('src.main.time.time', return_value=1000.0 + mock_config.price_cache_ttl_seconds):
+            await get_btc_price_cached(mock_price_fetcher, mock_config)
+        assert mock_price_fetcher.get_btc_price_with_retry.call_count == 2
+    
+    @pytest.mark.asyncio
+    async def test_get_btc_price_cached_does_not_reuse_failed_fetch(self, mock_config, mock_price_data):
+        """A failed fetch ({"usd": 0.0}) is not cached for the rest of the TTL bucket"""
+        mock_price_fetcher = AsyncMock()
+        mock_price_fetcher.get_btc_price_with_retry.side_effect = [{"usd": 0.0}, mock_price_data]
+        
+        with patch('src.main.time.time', return_value=1000.0):
+            first = await get_btc_price_cached(mock_price_fetcher, mock_config)
+            second = await get_btc_price_cached(mock_price_fetcher, mock_config)
+        
+        assert first == {"usd": 0.0}
+        assert second == mock_price_data
+        assert mock_price_fetcher.get_btc_price_with_retry.call_count == 2
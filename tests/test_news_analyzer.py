@@ -0,0 +1,242 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import patch, AsyncMock, MagicMock
+import src.news_analyzer as news_analyzer
+
+def make_tweet(i, text=None):
+    """Tweet row as returned by get_unprocessed_news_tweets; long enough to skip the pre-filter"""
+    return {
+        'id': i,
+        'original_tweet_id': str(i),
+        'tweet_text': text or f'Breaking: exchange number {i} lists a new spot Bitcoin product after regulators approve it'
+    }
+
+def groq_response(payload):
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps(payload)
+    return response
+
+SINGLE_ANALYSIS = {"significance": "High", "sentiment": "Positive", "summary": "New BTC product"}
+
+def record_flushes(analyzer):
+    """Make update_tweet_analysis_batch succeed and keep a copy of every flushed buffer"""
+    flushes = []
+    async def store(updates):
+        flushes.append(list(updates))
+        return {"analyzed": sum(1 for _, status, _, _ in updates if status == "analyzed")}
+    analyzer.news_repo.update_tweet_analysis_batch = AsyncMock(side_effect=store)
+    return flushes
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setenv('GROQ_API_KEY', 'test-key')
+    monkeypatch.delenv('DATABASE_URL', raising=False)
+    with patch.object(news_analyzer, 'NewsRepository'):
+        instance = news_analyzer.NewsAnalyzer(MagicMock())
+    assert instance.initialized
+    return instance
+
+@pytest.mark.asyncio
+async def test_run_cycle_stops_when_batch_is_not_stored(analyzer):
+    tweets = [
+        {'id': i, 'original_tweet_id': str(i), 'tweet_text': f'Breaking: SEC approves spot Bitcoin ETF filing number {i}'}
+        for i in range(1, 3)
+    ]
+    analyzer.batch_size = len(tweets)
+    # The DB write fails, so the same full batch stays unprocessed
+    analyzer.news_repo.get_unprocessed_news_tweets = AsyncMock(return_value=tweets)
+    analyzer.news_repo.update_tweet_analysis_batch = AsyncMock(return_value={})
+
+    response = MagicMock()
+    response.choices[0].message.content = json.dumps({"analyses": [
+        {"id": i, "significance": "High", "sentiment": "Positive", "summary": "ETF approved"}
+        for i in range(1, 3)
+    ]})
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=response)
+
+    await analyzer.run_cycle()
+
+    analyzer.groq_client.chat.completions.create.assert_awaited_once()
+    analyzer.news_repo.get_unprocessed_news_tweets.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_analyze_tweets_flushes_every_flush_size_results(analyzer):
+    analyzer.llm_sub_batch_size = 1
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response(SINGLE_ANALYSIS))
+    flushes = record_flushes(analyzer)
+    tweet_count = news_analyzer.ANALYSIS_FLUSH_SIZE + 5
+
+    stored = await analyzer.analyze_tweets([make_tweet(i) for i in range(1, tweet_count + 1)])
+
+    assert stored == tweet_count
+    assert [len(flush) for flush in flushes] == [news_analyzer.ANALYSIS_FLUSH_SIZE, 5]
+    assert {oid for flush in flushes for oid, _, _, _ in flush} == {str(i) for i in range(1, tweet_count + 1)}
+
+@pytest.mark.asyncio
+async def test_analyze_tweets_final_flush_writes_short_batch_once(analyzer):
+    analyzer.llm_sub_batch_size = 1
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response(SINGLE_ANALYSIS))
+    flushes = record_flushes(analyzer)
+
+    stored = await analyzer.analyze_tweets([make_tweet(i) for i in range(1, 4)])
+
+    assert stored == 3
+    assert len(flushes) == 1
+    assert sorted(oid for oid, status, _, _ in flushes[0] if status == "analyzed") == ["1", "2", "3"]
+
+@pytest.mark.asyncio
+async def test_analyze_tweets_marks_unfinished_tweets_and_duplicates_as_timed_out(analyzer):
+    analyzer.llm_sub_batch_size = 1
+    analyzer.processing_timeout = 0.05
+    slow_text = 'Breaking: a slow exchange lists a new spot Bitcoin product after regulators approve it today'
+    never = asyncio.Event()
+
+    async def create(**kwargs):
+        if slow_text in kwargs["messages"][0]["content"]:
+            await never.wait()
+        return groq_response(SINGLE_ANALYSIS)
+    analyzer.groq_client.chat.completions.create = AsyncMock(side_effect=create)
+    flushes = record_flushes(analyzer)
+
+    # Tweet 3 repeats tweet 2's text, so it waits on tweet 2's analysis
+    tweets = [make_tweet(1), make_tweet(2, slow_text), make_tweet(3, slow_text)]
+    stored = await analyzer.analyze_tweets(tweets)
+
+    statuses = {oid: status for flush in flushes for oid, status, _, _ in flush}
+    assert stored == 1
+    assert statuses == {"1": "analyzed", "2": "analysis_timeout", "3": "analysis_timeout"}
+
+@pytest.mark.asyncio
+async def test_analyze_batch_with_llm_maps_ids_including_numeric_strings(analyzer):
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response({"analyses": [
+        {"id": "3", "significance": "Low", "sentiment": "Neutral", "summary": "three"},
+        {"id": 1, "significance": "High", "sentiment": "Positive", "summary": "one"},
+        {"id": " 2 ", "significance": "Medium", "sentiment": "Negative", "summary": "two"},
+    ]}))
+
+    results = await analyzer._analyze_batch_with_llm(["a", "b", "c"])
+
+    assert [result["summary"] for result in results] == ["one", "two", "three"]
+    assert all(result["sentiment_source"] == "groq" for result in results)
+    analyzer.groq_client.chat.completions.create.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_analyze_batch_with_llm_leaves_gaps_for_short_or_garbled_responses(analyzer):
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response({"analyses": [
+        {"id": 1, "significance": "High", "sentiment": "Positive", "summary": "one"},
+        {"id": "7", "significance": "High", "sentiment": "Positive", "summary": "out of range"},
+        {"id": "two", "significance": "High", "sentiment": "Positive", "summary": "not a number"},
+        {"id": 3, "summary": "missing labels"},
+        "not an object",
+    ]}))
+    assert await analyzer._analyze_batch_with_llm(["a", "b", "c"]) == [
+        {"significance": "High", "sentiment": "Positive", "summary": "one", "sentiment_source": "groq"}, None, None
+    ]
+
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response({"result": "no list"}))
+    assert await analyzer._analyze_batch_with_llm(["a", "b"]) == [None, None]
+
+@pytest.mark.asyncio
+async def test_analyze_chunk_with_ids_falls_back_to_single_calls_for_misses(analyzer):
+    analyzer._analyze_batch_with_llm = AsyncMock(return_value=[
+        {"significance": "High", "sentiment": "Positive", "summary": "one", "sentiment_source": "groq"}, None
+    ])
+    single = {"significance": "Low", "sentiment": "Neutral", "summary": "two", "sentiment_source": "groq"}
+    analyzer._analyze_content_with_llm = AsyncMock(return_value=single)
+
+    results = await analyzer._analyze_chunk_with_ids([("1", "first"), ("2", "second")])
+
+    assert [(oid, result["summary"], error) for oid, result, error in results] == [("1", "one", None), ("2", "two", None)]
+    analyzer._analyze_content_with_llm.assert_awaited_once_with("second")
+
+@pytest.mark.asyncio
+async def test_analyze_chunk_with_ids_analyzes_each_tweet_when_batch_call_fails(analyzer):
+    analyzer._analyze_batch_with_llm = AsyncMock(side_effect=RuntimeError("Groq unavailable"))
+    analyzer._analyze_content_with_llm = AsyncMock(side_effect=[dict(SINGLE_ANALYSIS), RuntimeError("still down")])
+
+    results = await analyzer._analyze_chunk_with_ids([("1", "first"), ("2", "second")])
+
+    assert results[0] == ("1", SINGLE_ANALYSIS, None)
+    assert results[1][0] == "2" and results[1][1] is None and isinstance(results[1][2], RuntimeError)
+    assert analyzer._analyze_content_with_llm.await_count == 2
+
+@pytest.mark.asyncio
+async def test_analyze_tweets_reuses_cached_analysis_without_llm_call(analyzer):
+    analyzer.llm_sub_batch_size = 1
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response(SINGLE_ANALYSIS))
+    flushes = record_flushes(analyzer)
+    text = make_tweet(1)['tweet_text']
+
+    await analyzer.analyze_tweets([make_tweet(1)])
+    # Same headline retweeted later, with a URL and a mention that the cache key ignores
+    await analyzer.analyze_tweets([make_tweet(2, f"RT @someone: {text} https://t.co/abc")])
+
+    analyzer.groq_client.chat.completions.create.assert_awaited_once()
+    assert flushes[1][0][0] == "2"
+    assert flushes[1][0][2]["summary"] == SINGLE_ANALYSIS["summary"]
+
+@pytest.mark.asyncio
+async def test_analyze_tweets_analyzes_in_batch_duplicates_once(analyzer):
+    analyzer.llm_sub_batch_size = 1
+    analyzer.groq_client.chat.completions.create = AsyncMock(return_value=groq_response(SINGLE_ANALYSIS))
+    flushes = record_flushes(analyzer)
+    text = make_tweet(1)['tweet_text']
+
+    stored = await analyzer.analyze_tweets([make_tweet(1), make_tweet(2, text), make_tweet(3, text.upper())])
+
+    assert stored == 3
+    analyzer.groq_client.chat.completions.create.assert_awaited_once()
+    assert sorted(oid for oid, status, _, _ in flushes[0] if status == "analyzed") == ["1", "2", "3"]
+
+def test_analysis_cache_evicts_least_recently_used_at_capacity(analyzer):
+    analysis = {"significance": "High", "sentiment": "Positive", "summary": "s", "sentiment_source": "groq"}
+    with patch.object(news_analyzer, 'ANALYSIS_CACHE_SIZE', 2):
+        analyzer._store_cached_analysis("a", analysis)
+        analyzer._store_cached_analysis("b", analysis)
+        assert analyzer._get_cached_analysis("a") == analysis # "a" is now most recently used
+        analyzer._store_cached_analysis("c", analysis)
+
+    assert list(analyzer._analysis_cache) == ["a", "c"]
+    assert analyzer._get_cached_analysis("b") is None
+
+def test_analysis_cache_skips_vader_fallbacks(analyzer):
+    analyzer._store_cached_analysis("a", {"significance": None, "sentiment": "Neutral", "sentiment_source": "vader_fallback_groq_api_error"})
+    assert analyzer._get_cached_analysis("a") is None
+
+def fixed_vader(compound):
+    vader = MagicMock()
+    vader.polarity_scores.return_value = {"compound": compound}
+    return vader
+
+def test_prefilter_skips_short_text_with_no_news_signal(analyzer):
+    text = ("meetup " * 20)[:news_analyzer.NEWS_LLM_PRIOR_MIN_LENGTH]
+    analysis = analyzer._prefilter_analysis(text)
+    assert analysis["significance"] == "Low"
+    assert analysis["sentiment_source"] == "vader_prefilter"
+
+def test_prefilter_sends_text_over_min_length_to_llm(analyzer):
+    text = ("meetup " * 20)[:news_analyzer.NEWS_LLM_PRIOR_MIN_LENGTH + 1]
+    assert analyzer._prefilter_analysis(text) is None
+
+def test_prefilter_score_threshold_boundaries(analyzer):
+    # One keyword hit scores 0.1, exactly the default threshold
+    assert analyzer._prefilter_analysis("Breaking news today") is None
+
+    # 0.5 * |compound| just below / at the threshold
+    analyzer.vader_analyzer = fixed_vader(0.19)
+    assert analyzer._prefilter_analysis("see you at the meetup")["significance"] == "Low"
+    analyzer.vader_analyzer = fixed_vader(-0.2)
+    assert analyzer._prefilter_analysis("see you at the meetup") is None
+
+def test_prefilter_honours_configured_threshold(monkeypatch):
+    monkeypatch.setenv('GROQ_API_KEY', 'test-key')
+    monkeypatch.setenv('NEWS_LLM_PRIOR_THRESHOLD', '0.5')
+    with patch.object(news_analyzer, 'NewsRepository'):
+        instance = news_analyzer.NewsAnalyzer(MagicMock())
+    assert instance.llm_prior_threshold == 0.5
+
+    # A single keyword hit no longer clears the raised threshold
+    assert instance._prefilter_analysis("Breaking news today")["significance"] == "Low"
+    instance.llm_prior_threshold = 0.0
+    assert instance._prefilter_analysis("see you at the meetup") is None
@@ -17,6 +17,7 @@ async def test_get_btc_price():
         # Create a mock for the response
         mock_resp = AsyncMock()
         mock_resp.status = 200
+        mock_resp.headers = {}
         mock_resp.json.return_value = mock_response
         mock_resp.__aenter__.return_value = mock_resp
         mock_get.return_value = mock_resp
@@ -51,6 +52,7 @@ async def test_get_btc_price_with_retry():
         # Create a mock for the response
         mock_resp = AsyncMock()
         mock_resp.status = 200
+        mock_resp.headers = {}
         mock_resp.json.return_value = mock_response
         mock_resp.__aenter__.return_value = mock_resp
         mock_get.return_value = mock_resp
@@ -82,4 +84,71 @@ async def test_get_btc_price_retry_on_error():
                 assert price["usd_24h_change"] == 2.5
                 
                 # Verify get_btc_price was called twice (1 fail + 1 success)
-                assert mock_get_price.call_count == 2 
\ No newline at end of file
+                assert mock_get_price.call_count == 2 
+
+@pytest.mark.asyncio
+async def test_get_btc_price_not_modified_uses_cached_price():
+    """Test that a 304 reply to If-None-Match returns the previously fetched price"""
+    mock_response = {
+        "bitcoin": {
+            "usd": 50000.0,
+            "usd_24h_change": 2.5
+        }
+    }
+    
+    with patch('src.price_fetcher.aiohttp.ClientSession.get') as mock_get:
+        first_resp = AsyncMock()
+        first_resp.status = 200
+        first_resp.headers = {"ETag": 'W/"abc123"'}
+        first_resp.json.return_value = mock_response
+        first_resp.__aenter__.return_value = first_resp
+        
+        not_modified_resp = AsyncMock()
+        not_modified_resp.status = 304
+        not_modified_resp.headers = {"ETag": 'W/"abc123"'}
+        not_modified_resp.__aenter__.return_value = not_modified_resp
+        
+        mock_get.side_effect = [first_resp, not_modified_resp]
+        
+        async with PriceFetcher() as fetcher:
+            first = await fetcher.get_btc_price()
+            second = await fetcher.get_btc_price()
+        
+        assert second == first
+        assert second["usd"] == 50000.0
+        # The second request is conditional on the first response's ETag
+        assert mock_get.call_args_list[1].kwargs["headers"] == {"If-None-Match": 'W/"abc123"'}
+        not_modified_resp.json.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_btc_price_with_retry_honours_retry_after():
+    """Test that a 429 waits for the Retry-After period before trying again"""
+    mock_response = {
+        "bitcoin": {
+            "usd": 50000.0,
+            "usd_24h_change": 2.5
+        }
+    }
+    
+    with patch('src.price_fetcher.aiohttp.ClientSession.get') as mock_get, \
+         patch('src.price_fetcher.asyncio.sleep', new_callable=AsyncMock) as mock_sleep:
+        limited_resp = AsyncMock()
+        limited_resp.status = 429
+        limited_resp.headers = {"Retry-After": "30"}
+        limited_resp.__aenter__.return_value = limited_resp
+        
+        ok_resp = AsyncMock()
+        ok_resp.status = 200
+        ok_resp.headers = {}
+        ok_resp.json.return_value = mock_response
+        ok_resp.__aenter__.return_value = ok_resp
+        
+        mock_get.side_effect = [limited_resp, ok_resp]
+        
+        async with PriceFetcher() as fetcher:
+            price = await fetcher.get_btc_price_with_retry(max_retries=3)
+        
+        assert price["usd"] == 50000.0
+        assert mock_get.call_count == 2
+        mock_sleep.assert_awaited_once()
+        assert 29 < mock_sleep.await_args.args[0] <= 30
@@ -0,0 +1,38 @@
+import pytest
+import os
+import sys
+import sqlite3
+from unittest.mock import patch
+
+# Add the src directory to the path so we can import modules
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
+
+from src.prompt_templates import PromptManager
+
+class TestPromptManager:
+    """Test suite for PromptManager"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """PromptManager backed by a temporary SQLite file"""
+        db_path = str(tmp_path / "prompts.db")
+        with patch('src.prompt_templates.get_db_connection', lambda path=None: sqlite3.connect(path)):
+            yield PromptManager(db_path)
+
+    def test_update_performance_score_invalidates_list_cache(self, manager):
+        """A new score shows up in list_templates() straight away"""
+        template_id = manager.create_template("price", "BTC is {price}", "price_update")
+        assert manager.list_templates("price_update")[0]["performance_score"] == 0
+
+        manager.update_performance_score(template_id, 1.0)
+
+        assert manager.list_templates("price_update")[0]["performance_score"] == pytest.approx(0.3)
+
+    def test_update_template_usage_invalidates_list_cache(self, manager):
+        """last_used shows up in list_templates() straight away"""
+        template_id = manager.create_template("joke", "Tell a joke", "joke")
+        assert manager.list_templates()[0]["last_used"] is None
+
+        manager.update_template_usage(template_id)
+
+        assert manager.list_templates()[0]["last_used"] is not None